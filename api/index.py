@@ -5,6 +5,7 @@ Main FastAPI application that combines all module routers
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import sys
 import os
 
@@ -48,6 +49,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Analysis payloads are large, repetitive JSON; compress anything over 1 KB for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Include routers
 app.include_router(analysis_router)
 app.include_router(conversation_router)
@@ -84,3 +88,11 @@ async def health_check():
 
 # Export the app for Vercel
 # Vercel will automatically detect and use the 'app' variable
+
+# Local / self-hosted run: uvicorn picks the uvloop event loop and httptools HTTP parser
+# when they are installed (both come with uvicorn[standard]) and falls back to asyncio/h11.
+# Equivalent CLI:
+#   uvicorn api.index:app --workers 4
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
@@ -4,18 +4,125 @@ Analyzes patient conversation records to detect significant changes in symptoms
 Uses Claude API for intelligent analysis
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime
 import json
+import re
 import anthropic
 import os
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 # Create router for conversation analysis endpoints
 router = APIRouter(prefix="/api/conversation", tags=["conversation_analysis"])
 
 
+# Records analyzed per Claude call in batch mode
+MAX_RECORDS_PER_BATCH = 4
+
+# Rough prompt budget per batched call (estimated at ~4 characters per token)
+MAX_BATCH_PROMPT_TOKENS = 100_000
+
+# Output tokens reserved per record in a batched call (capped by the model limit)
+BATCH_OUTPUT_TOKENS_PER_RECORD = 2048
+MAX_OUTPUT_TOKENS = 8192
+
+# Static parts of the analysis prompt, shared by single and batched requests
+ANALYSIS_INSTRUCTIONS = """## ANALYSIS INSTRUCTIONS
+
+Please provide a comprehensive analysis of this patient's conversation record focusing on:
+
+### 1. MOOD ASSESSMENT
+- Evaluate the patient's current emotional state based on conversation tone and check-in data
+- Determine if there are changes from the baseline (if available)
+- Identify specific indicators of mood changes (positive or negative)
+- Assess severity of any mood-related concerns
+
+### 2. SYMPTOM ASSESSMENT
+Analyze for changes in:
+- **Cognitive function**: Memory issues, confusion, disorientation, difficulty with tasks
+- **Behavioral patterns**: Agitation, aggression, withdrawal, personality changes
+- **Physical symptoms**: Pain, fatigue, sleep disturbances, appetite changes
+
+### 3. CONVERSATION ATTITUDE ANALYSIS
+- **Engagement level**: How actively the patient participates in conversation
+- **Coherence**: How clear and logical their responses are
+- **Emotional tone**: Overall emotional quality of their communication
+- **Concerns expressed**: What the patient is worried about or mentioning
+
+### 4. ROUTINE CHECK-IN ANALYSIS
+- Identify significant changes in quantitative metrics
+- Recognize concerning trends or patterns
+- Flag any risk indicators
+
+### 5. CLINICAL INSIGHTS
+Provide professional clinical perspective on:
+- Overall patient status
+- Potential underlying causes for observed changes
+- Relationship between different symptoms/signs
+- Risk assessment
+
+### 6. DOCTOR CONTACT DECISION
+Based on your analysis, determine:
+- Should the doctor be contacted? (Yes/No)
+- What is the urgency level? (routine/soon/urgent/immediate)
+- What is the reasoning for this decision?
+- What specific actions should be taken?
+- What are the specific concerns to communicate to the doctor?"""
+
+ANALYSIS_RESPONSE_SCHEMA = """{
+    "mood_assessment": {
+        "current_state": "description of current mood state",
+        "change_from_baseline": "improved|stable|declined|significantly_declined|no_baseline",
+        "indicators": ["indicator 1", "indicator 2"],
+        "severity": "normal|mild|moderate|severe"
+    },
+    "symptom_assessment": {
+        "cognitive_changes": {
+            "observed": true|false,
+            "details": "specific details about cognitive changes observed",
+            "severity": "none|mild|moderate|severe"
+        },
+        "behavioral_changes": {
+            "observed": true|false,
+            "details": "specific details about behavioral changes observed",
+            "severity": "none|mild|moderate|severe"
+        },
+        "physical_symptoms": {
+            "observed": true|false,
+            "details": "specific details about physical symptoms observed",
+            "severity": "none|mild|moderate|severe"
+        }
+    },
+    "conversation_attitude": {
+        "engagement_level": "high|moderate|low|very_low",
+        "coherence": "clear|mostly_clear|confused|very_confused",
+        "emotional_tone": "positive|neutral|negative|distressed",
+        "concerns_expressed": ["concern 1", "concern 2"]
+    },
+    "routine_check_in_analysis": {
+        "significant_changes": ["change 1", "change 2"],
+        "trends": "description of observed trends",
+        "risk_indicators": ["risk 1", "risk 2"]
+    },
+    "clinical_insights": "comprehensive clinical perspective on the patient's overall status",
+    "concern_level": "low|moderate|high|critical",
+    "contact_doctor_decision": {
+        "should_contact": true|false,
+        "urgency": "routine|soon|urgent|immediate",
+        "reasoning": "detailed reasoning for the decision",
+        "recommended_actions": ["action 1", "action 2"],
+        "specific_concerns": ["concern 1", "concern 2"]
+    }
+}"""
+
+ANALYSIS_GUIDELINES = """- Ensure all fields are present in your response
+- Use clinical terminology appropriately
+- Be specific and evidence-based in your assessments
+- Consider both acute changes and gradual trends
+- Prioritize patient safety in your recommendations"""
+
+
 class ConversationAnalyzer:
     """
     Analyzes conversation records to detect symptom and mood changes in patients.
@@ -149,158 +256,115 @@ class ConversationAnalyzer:
         This is the core prompt that instructs Claude how to analyze the conversation
         """
 
-        # Extract conversation history
-        conversations = record.get("conversations", [])
-        conversation_text = self._format_conversations(conversations)
-
-        # Extract routine check-in data
-        routine_check_in = record.get("routine_check_in", {})
-        previous_baseline = record.get("previous_baseline", None)
-
         # Build the comprehensive prompt
         prompt = f"""You are a clinical AI assistant specializing in analyzing patient conversations for Alzheimer's and dementia care. Your task is to analyze a patient conversation record and determine if there are significant changes in symptoms or mood that warrant contacting their doctor.
 
-**PATIENT ID:** {record.get('patient_id')}
-**CONVERSATION DATE:** {record.get('conversation_date')}
+{self._format_record_section(record)}
 
 ---
 
-## CONVERSATION HISTORY
-
-{conversation_text}
+{ANALYSIS_INSTRUCTIONS}
 
 ---
 
-## ROUTINE CHECK-IN DATA
+## OUTPUT FORMAT
 
-**Current Check-in:**
-- Mood Scale (1-10): {routine_check_in.get('mood_scale', 'N/A')}
-- Energy Level (1-10): {routine_check_in.get('energy_level', 'N/A')}
-- Sleep Quality (1-10): {routine_check_in.get('sleep_quality', 'N/A')}
-- Pain Level (0-10): {routine_check_in.get('pain_level', 'N/A')}
-- Appetite: {routine_check_in.get('appetite', 'N/A')}
-- Social Engagement: {routine_check_in.get('social_engagement', 'N/A')}
-- Cognitive Clarity (1-10): {routine_check_in.get('cognitive_clarity', 'N/A')}
+Provide your analysis as a **valid JSON object** with the following structure:
 
-{self._format_baseline_comparison(previous_baseline, routine_check_in) if previous_baseline else "**No previous baseline available for comparison**"}
+```json
+{ANALYSIS_RESPONSE_SCHEMA}
+```
 
----
+**IMPORTANT:**
+- Return ONLY the JSON object, no additional text
+{ANALYSIS_GUIDELINES}
 
-## ANALYSIS INSTRUCTIONS
+Please analyze this conversation record now."""
 
-Please provide a comprehensive analysis of this patient's conversation record focusing on:
+        return prompt
 
-### 1. MOOD ASSESSMENT
-- Evaluate the patient's current emotional state based on conversation tone and check-in data
-- Determine if there are changes from the baseline (if available)
-- Identify specific indicators of mood changes (positive or negative)
-- Assess severity of any mood-related concerns
+    def _create_batched_prompt(self, records: List[Dict[str, Any]]) -> str:
+        """
+        Create a single prompt that analyzes several conversation records at once
+        The static instructions are sent once and Claude returns a JSON array with
+        one result per record, in the same order as the records
+        """
 
-### 2. SYMPTOM ASSESSMENT
-Analyze for changes in:
-- **Cognitive function**: Memory issues, confusion, disorientation, difficulty with tasks
-- **Behavioral patterns**: Agitation, aggression, withdrawal, personality changes
-- **Physical symptoms**: Pain, fatigue, sleep disturbances, appetite changes
+        record_sections = "\n\n---\n\n".join(
+            f"# RECORD {i}/{len(records)}\n\n{self._format_record_section(record)}"
+            for i, record in enumerate(records, 1)
+        )
 
-### 3. CONVERSATION ATTITUDE ANALYSIS
-- **Engagement level**: How actively the patient participates in conversation
-- **Coherence**: How clear and logical their responses are
-- **Emotional tone**: Overall emotional quality of their communication
-- **Concerns expressed**: What the patient is worried about or mentioning
+        prompt = f"""You are a clinical AI assistant specializing in analyzing patient conversations for Alzheimer's and dementia care. Your task is to analyze {len(records)} independent patient conversation records and, for each one, determine if there are significant changes in symptoms or mood that warrant contacting their doctor.
 
-### 4. ROUTINE CHECK-IN ANALYSIS
-- Identify significant changes in quantitative metrics
-- Recognize concerning trends or patterns
-- Flag any risk indicators
+{record_sections}
 
-### 5. CLINICAL INSIGHTS
-Provide professional clinical perspective on:
-- Overall patient status
-- Potential underlying causes for observed changes
-- Relationship between different symptoms/signs
-- Risk assessment
+---
 
-### 6. DOCTOR CONTACT DECISION
-Based on your analysis, determine:
-- Should the doctor be contacted? (Yes/No)
-- What is the urgency level? (routine/soon/urgent/immediate)
-- What is the reasoning for this decision?
-- What specific actions should be taken?
-- What are the specific concerns to communicate to the doctor?
+{ANALYSIS_INSTRUCTIONS}
 
 ---
 
 ## OUTPUT FORMAT
 
-Provide your analysis as a **valid JSON object** with the following structure:
+Analyze every record independently; never mix information between records.
+Provide your analysis as a **valid JSON array** containing exactly {len(records)} objects, one per record in the order given above (RECORD 1 first). Each object must have the following structure:
 
 ```json
-{{
-    "mood_assessment": {{
-        "current_state": "description of current mood state",
-        "change_from_baseline": "improved|stable|declined|significantly_declined|no_baseline",
-        "indicators": ["indicator 1", "indicator 2"],
-        "severity": "normal|mild|moderate|severe"
-    }},
-    "symptom_assessment": {{
-        "cognitive_changes": {{
-            "observed": true|false,
-            "details": "specific details about cognitive changes observed",
-            "severity": "none|mild|moderate|severe"
-        }},
-        "behavioral_changes": {{
-            "observed": true|false,
-            "details": "specific details about behavioral changes observed",
-            "severity": "none|mild|moderate|severe"
-        }},
-        "physical_symptoms": {{
-            "observed": true|false,
-            "details": "specific details about physical symptoms observed",
-            "severity": "none|mild|moderate|severe"
-        }}
-    }},
-    "conversation_attitude": {{
-        "engagement_level": "high|moderate|low|very_low",
-        "coherence": "clear|mostly_clear|confused|very_confused",
-        "emotional_tone": "positive|neutral|negative|distressed",
-        "concerns_expressed": ["concern 1", "concern 2"]
-    }},
-    "routine_check_in_analysis": {{
-        "significant_changes": ["change 1", "change 2"],
-        "trends": "description of observed trends",
-        "risk_indicators": ["risk 1", "risk 2"]
-    }},
-    "clinical_insights": "comprehensive clinical perspective on the patient's overall status",
-    "concern_level": "low|moderate|high|critical",
-    "contact_doctor_decision": {{
-        "should_contact": true|false,
-        "urgency": "routine|soon|urgent|immediate",
-        "reasoning": "detailed reasoning for the decision",
-        "recommended_actions": ["action 1", "action 2"],
-        "specific_concerns": ["concern 1", "concern 2"]
-    }}
-}}
+{ANALYSIS_RESPONSE_SCHEMA}
 ```
 
 **IMPORTANT:**
-- Return ONLY the JSON object, no additional text
-- Ensure all fields are present in your response
-- Use clinical terminology appropriately
-- Be specific and evidence-based in your assessments
-- Consider both acute changes and gradual trends
-- Prioritize patient safety in your recommendations
+- Return ONLY the JSON array, no additional text
+{ANALYSIS_GUIDELINES}
 
-Please analyze this conversation record now."""
+Please analyze these conversation records now."""
 
         return prompt
 
+    def _format_record_section(self, record: Dict[str, Any]) -> str:
+        """Format the patient-specific part of the prompt (conversation + check-in data)"""
+
+        # Extract conversation history
+        conversations = record.get("conversations", [])
+        conversation_text = self._format_conversations(conversations)
+
+        # Extract routine check-in data
+        routine_check_in = record.get("routine_check_in", {})
+        previous_baseline = record.get("previous_baseline", None)
+
+        return f"""**PATIENT ID:** {record.get('patient_id')}
+**CONVERSATION DATE:** {record.get('conversation_date')}
+
+---
+
+## CONVERSATION HISTORY
+
+{conversation_text}
+
+---
+
+## ROUTINE CHECK-IN DATA
+
+**Current Check-in:**
+- Mood Scale (1-10): {routine_check_in.get('mood_scale', 'N/A')}
+- Energy Level (1-10): {routine_check_in.get('energy_level', 'N/A')}
+- Sleep Quality (1-10): {routine_check_in.get('sleep_quality', 'N/A')}
+- Pain Level (0-10): {routine_check_in.get('pain_level', 'N/A')}
+- Appetite: {routine_check_in.get('appetite', 'N/A')}
+- Social Engagement: {routine_check_in.get('social_engagement', 'N/A')}
+- Cognitive Clarity (1-10): {routine_check_in.get('cognitive_clarity', 'N/A')}
+
+{self._format_baseline_comparison(previous_baseline, routine_check_in) if previous_baseline else "**No previous baseline available for comparison**"}"""
+
     def _format_conversations(self, conversations: List[Dict[str, Any]]) -> str:
         """Format conversation history for the prompt"""
         formatted = []
 
         for conv in conversations:
             timestamp = conv.get('timestamp', 'Unknown time')
-            speaker = conv.get('speaker', 'Unknown').upper()
+            # Validated records carry the prompt label precomputed (see ConversationMessage)
+            speaker = conv.get('speaker_upper') or conv.get('speaker', 'Unknown').upper()
             message = conv.get('message', '')
 
             formatted.append(f"[{timestamp}] {speaker}: {message}")
@@ -336,12 +400,13 @@ Please analyze this conversation record now."""
 
         return comparison
 
-    def _call_claude_api(self, prompt: str) -> str:
+    def _call_claude_api(self, prompt: str, max_tokens: int = 4096) -> str:
         """
         Call Claude API to perform the analysis
 
         Args:
             prompt: The analysis prompt
+            max_tokens: Maximum number of tokens Claude may generate
 
         Returns:
             Raw response text from Claude
@@ -349,7 +414,7 @@ Please analyze this conversation record now."""
         try:
             message = self.client.messages.create(
                 model=self.model,
-                max_tokens=4096,
+                max_tokens=max_tokens,
                 temperature=0.3,  # Lower temperature for more consistent clinical analysis
                 messages=[
                     {
@@ -378,92 +443,185 @@ Please analyze this conversation record now."""
             Structured analysis result
         """
         try:
-            # Try to parse as JSON
             # Sometimes Claude wraps JSON in markdown code blocks, so we need to extract it
-            import re
+            llm_analysis = json.loads(self._extract_json(llm_response, r'\{.*\}'))
 
-            # Remove markdown code blocks if present
-            json_match = re.search(r'```json\s*(.*?)\s*```', llm_response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find any JSON object in the response
-                json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    json_str = llm_response
-
-            # Parse the JSON
-            llm_analysis = json.loads(json_str)
-
-            # Extract the contact decision from the parsed response
-            contact_decision = llm_analysis.pop("contact_doctor_decision", {
-                "should_contact": False,
-                "urgency": "routine",
-                "reasoning": "Unable to determine from analysis",
-                "recommended_actions": [],
-                "specific_concerns": []
-            })
-
-            # Build the final structured result
-            result = {
-                "analysis_timestamp": datetime.utcnow().isoformat(),
-                "patient_id": original_record.get("patient_id"),
-                "llm_analysis": llm_analysis,
-                "contact_doctor_decision": contact_decision
-            }
-
-            return result
+            return self._build_analysis_result(llm_analysis, original_record)
 
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}\n\nResponse: {llm_response}")
         except Exception as e:
             raise RuntimeError(f"Error parsing LLM response: {str(e)}")
 
+    def _parse_llm_response_batch(self, llm_response: str, original_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Parse a batched LLM response (JSON array) into one structured result per record
+
+        Args:
+            llm_response: Raw response from Claude
+            original_records: Conversation records in the order they were sent
+
+        Returns:
+            List of structured analysis results, in the same order as the records
+        """
+        try:
+            llm_analyses = json.loads(self._extract_json(llm_response, r'\[.*\]'))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse batched LLM response as JSON: {str(e)}\n\nResponse: {llm_response}")
+
+        if not isinstance(llm_analyses, list) or len(llm_analyses) != len(original_records):
+            raise ValueError(
+                f"Expected a JSON array with {len(original_records)} results, got: {llm_response}"
+            )
+
+        return [
+            self._build_analysis_result(llm_analysis, record)
+            for llm_analysis, record in zip(llm_analyses, original_records)
+        ]
+
+    def _extract_json(self, llm_response: str, fallback_pattern: str) -> str:
+        """Extract the JSON payload from a response that may be wrapped in a markdown code block"""
+        json_match = re.search(r'```json\s*(.*?)\s*```', llm_response, re.DOTALL)
+        if json_match:
+            return json_match.group(1)
+
+        # Try to find any JSON value matching the expected shape in the response
+        json_match = re.search(fallback_pattern, llm_response, re.DOTALL)
+        if json_match:
+            return json_match.group(0)
+
+        return llm_response
+
+    def _build_analysis_result(self, llm_analysis: Dict[str, Any], original_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the final structured result from a parsed LLM analysis"""
+
+        # Extract the contact decision from the parsed response
+        contact_decision = llm_analysis.pop("contact_doctor_decision", {
+            "should_contact": False,
+            "urgency": "routine",
+            "reasoning": "Unable to determine from analysis",
+            "recommended_actions": [],
+            "specific_concerns": []
+        })
+
+        return {
+            "analysis_timestamp": datetime.utcnow().isoformat(),
+            "patient_id": original_record.get("patient_id"),
+            "llm_analysis": llm_analysis,
+            "contact_doctor_decision": contact_decision
+        }
+
     def batch_analyze(self, conversation_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Analyze multiple conversation records in batch
 
+        Records are grouped so that several of them share a single Claude call
+        (see MAX_RECORDS_PER_BATCH / MAX_BATCH_PROMPT_TOKENS).
+
         Args:
             conversation_records: List of conversation record dictionaries
 
         Returns:
-            List of analysis results
+            List of analysis results, in the same order as the input records
         """
-        results = []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(conversation_records)
 
-        for record in conversation_records:
+        # Validate up front so one bad record doesn't fail the whole batch
+        valid_indices = []
+        for i, record in enumerate(conversation_records):
             try:
-                result = self.analyze_conversation_record(record)
-                results.append(result)
+                self._validate_conversation_record(record)
+                valid_indices.append(i)
             except Exception as e:
-                # Add error result for this record
-                results.append({
-                    "analysis_timestamp": datetime.utcnow().isoformat(),
-                    "patient_id": record.get("patient_id", "unknown"),
-                    "error": str(e),
-                    "llm_analysis": None,
-                    "contact_doctor_decision": {
-                        "should_contact": False,
-                        "urgency": "routine",
-                        "reasoning": f"Analysis failed: {str(e)}",
-                        "recommended_actions": ["Retry analysis", "Manual review required"],
-                        "specific_concerns": ["Analysis error"]
-                    }
-                })
+                results[i] = self._build_error_result(record, e)
+
+        for chunk in self._chunk_records(valid_indices, conversation_records):
+            records = [conversation_records[i] for i in chunk]
+            if len(records) == 1:
+                chunk_results = [self._analyze_or_error(records[0])]
+            else:
+                try:
+                    prompt = self._create_batched_prompt(records)
+                    max_tokens = min(MAX_OUTPUT_TOKENS, BATCH_OUTPUT_TOKENS_PER_RECORD * len(records))
+                    llm_response = self._call_claude_api(prompt, max_tokens=max_tokens)
+                    chunk_results = self._parse_llm_response_batch(llm_response, records)
+                except Exception:
+                    # The shared call or its response failed; analyze the chunk's records one
+                    # by one so only the records that fail on their own get an error result
+                    chunk_results = [self._analyze_or_error(record) for record in records]
+
+            for i, result in zip(chunk, chunk_results):
+                results[i] = result
 
         return results
 
+    def _chunk_records(self, indices: List[int], records: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Group record indices into batches bounded by MAX_RECORDS_PER_BATCH and
+        by the estimated prompt size (MAX_BATCH_PROMPT_TOKENS)
+        """
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for i in indices:
+            record_tokens = len(self._format_record_section(records[i])) // 4
+            if current and (
+                len(current) >= MAX_RECORDS_PER_BATCH
+                or current_tokens + record_tokens > MAX_BATCH_PROMPT_TOKENS
+            ):
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += record_tokens
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def _analyze_or_error(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze a single record, returning an error result instead of raising"""
+        try:
+            return self.analyze_conversation_record(record)
+        except Exception as e:
+            return self._build_error_result(record, e)
+
+    def _build_error_result(self, record: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Build the error result returned for a record that could not be analyzed"""
+        return {
+            "analysis_timestamp": datetime.utcnow().isoformat(),
+            "patient_id": record.get("patient_id", "unknown"),
+            "error": str(error),
+            "llm_analysis": None,
+            "contact_doctor_decision": {
+                "should_contact": False,
+                "urgency": "routine",
+                "reasoning": f"Analysis failed: {str(error)}",
+                "recommended_actions": ["Retry analysis", "Manual review required"],
+                "specific_concerns": ["Analysis error"]
+            }
+        }
+
 
 # ==================== FastAPI Endpoints ====================
 
 # Request/Response Models
+SpeakerRole = Literal["patient", "bot", "system"]
+
+# Speaker labels as rendered in the analysis prompt
+_SPEAKER_LABELS: Dict[str, str] = {"patient": "PATIENT", "bot": "BOT", "system": "SYSTEM"}
+
 class ConversationMessage(BaseModel):
     timestamp: str
-    speaker: str  # "patient" or "bot"
+    speaker: SpeakerRole
     message: str
 
+    @computed_field
+    @property
+    def speaker_upper(self) -> str:
+        return _SPEAKER_LABELS[self.speaker]
+
 class RoutineCheckIn(BaseModel):
     mood_scale: Optional[int] = None
     energy_level: Optional[int] = None
@@ -502,6 +660,12 @@ class BatchAnalyzeResponse(BaseModel):
 # Global analyzer instance (will be initialized with API key)
 _analyzer_instance: Optional[ConversationAnalyzer] = None
 
+# Whether an API key was configured in the environment at import time
+_ENV_KEY_PRESENT = (
+    os.environ.get("CLAUDE_API_KEY") is not None or
+    os.environ.get("ANTHROPIC_API_KEY") is not None
+)
+
 def get_analyzer(api_key: Optional[str] = None) -> ConversationAnalyzer:
     """Get or create analyzer instance with API key"""
     global _analyzer_instance
@@ -579,15 +743,10 @@ def batch_analyze_conversations(request: BatchAnalyzeRequest):
 @router.get("/health")
 def conversation_analyzer_health():
     """Health check for conversation analyzer"""
-    api_key_configured = (
-        os.environ.get("CLAUDE_API_KEY") is not None or
-        os.environ.get("ANTHROPIC_API_KEY") is not None
-    )
-
     return {
         "status": "healthy",
         "service": "Conversation Analyzer",
-        "claude_api_configured": api_key_configured
+        "claude_api_configured": _ENV_KEY_PRESENT
     }
 
 
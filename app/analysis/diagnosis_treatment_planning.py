@@ -3,15 +3,22 @@ Diagnosis and Treatment Planning Module
 Handles Alzheimer's prediction analysis and generates comprehensive treatment plans
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from datetime import datetime
+import asyncio
 import sys
 import os
 import json
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from pydantic import BaseModel
 import anthropic
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 # Add ml directory to path for Alzheimer's predictor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'ml'))
 
@@ -22,6 +29,69 @@ except ImportError:
     PREDICTOR_AVAILABLE = False
     print("Warning: Alzheimer's predictor not available")
 
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-patient predictions into one batched call
+
+    The first queued request opens a window of up to `max_wait` seconds; everything that
+    arrives meanwhile (up to `max_batch` requests) is predicted together, so the forest is
+    walked once for the whole batch instead of once per patient.
+    """
+
+    def __init__(self, predict_many: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 max_batch: int = 64, max_wait: float = 0.008):
+        self.predict_many = predict_many
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def predict(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        # Queue and worker belong to one event loop; start fresh if the loop changed
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((patient_data, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._resolve(batch)
+
+    def _resolve(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            results = self.predict_many([patient_data for patient_data, _ in batch])
+        except Exception as e:
+            # One bad request shouldn't fail the others: retry one by one so only it errors
+            if len(batch) > 1:
+                for item in batch:
+                    self._resolve([item])
+                return
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
 class DiagnosisTreatmentPlanner:
     """
     Handles diagnosis analysis and treatment planning for Alzheimer's patients
@@ -36,6 +106,7 @@ class DiagnosisTreatmentPlanner:
         else:
             self.anthropic_client = None
         self._initialize_predictor()
+        self._batcher = PredictionBatcher(self._predict_many)
     
     def _initialize_predictor(self):
         """Initialize the Alzheimer's predictor model"""
@@ -47,8 +118,9 @@ class DiagnosisTreatmentPlanner:
             model_path = os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'alzheimers_model.joblib')
             scaler_path = os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'alzheimers_scaler.joblib')
             feature_names_path = os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'feature_names.joblib')
+            packed_path = os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'alzheimers_packed')
             
-            self.predictor.load_model(model_path=model_path, scaler_path=scaler_path, feature_names_path=feature_names_path)
+            self.predictor.load_model(model_path=model_path, scaler_path=scaler_path, feature_names_path=feature_names_path, packed_path=packed_path)
             print("✓ Alzheimer's predictor loaded successfully")
         except Exception as e:
             print(f"⚠ Warning: Could not load Alzheimer's predictor: {e}")
@@ -74,7 +146,33 @@ class DiagnosisTreatmentPlanner:
         # Run Alzheimer's prediction
         prediction_result = self.predictor.predict_diagnosis(patient_data)
         
-        # Generate comprehensive analysis
+        return self._build_analysis_result(patient_data, prediction_result)
+    
+    async def analyze_intake_data_async(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of analyze_intake_data for async endpoints
+        
+        The prediction is batched with other concurrent callers; the analysis and
+        treatment planning (which may call the LLM) run in a worker thread.
+        
+        Args:
+            patient_data: Dictionary containing patient intake information
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        
+        if self.predictor is None:
+            raise ValueError("Alzheimer's predictor model not available")
+        
+        patient_data = self._prepare_patient_data(patient_data)
+        prediction_result = await self._batcher.predict(patient_data)
+        
+        return await asyncio.to_thread(self._build_analysis_result, patient_data, prediction_result)
+    
+    def _build_analysis_result(self, patient_data: Dict[str, Any],
+                               prediction_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the comprehensive analysis for a prediction and assemble the result"""
         analysis = self._generate_comprehensive_analysis(patient_data, prediction_result)
         
         return {
@@ -663,6 +761,9 @@ class DiagnosisTreatmentPlanner:
         """Check if the Alzheimer's predictor is available"""
         return self.predictor is not None
     
+    def _predict_many(self, patients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.predictor.predict_diagnoses(patients)
+    
     def get_prediction_confidence(self, patient_data: Dict[str, Any]) -> Optional[float]:
         """Get prediction confidence for given patient data"""
         if not self.is_predictor_available():
@@ -1119,10 +1220,11 @@ class DirectAnalysisResponse(BaseModel):
 
 # ---------- Analysis Endpoints ----------
 @router.post("/direct", response_model=DirectAnalysisResponse)
-def direct_analysis_using_planner(req: DirectAnalysisRequest):
+async def direct_analysis_using_planner(req: DirectAnalysisRequest, accept: Optional[str] = Header(None)):
     """
     Direct analysis endpoint using DiagnosisTreatmentPlanner
     Returns patient portfolio, diagnosis analysis, and treatment plan
+    (as MessagePack when the client accepts application/msgpack and msgpack is installed)
     """
     
     if not diagnosis_planner.is_predictor_available():
@@ -1133,9 +1235,9 @@ def direct_analysis_using_planner(req: DirectAnalysisRequest):
     
     try:
         # Use the diagnosis planner to analyze patient data directly
-        analysis_result = diagnosis_planner.analyze_intake_data(req.patient_data)
+        analysis_result = await diagnosis_planner.analyze_intake_data_async(req.patient_data)
         
-        return DirectAnalysisResponse(
+        response = DirectAnalysisResponse(
             patient_portfolio=analysis_result["patient_portfolio"],
             diagnosis_analysis=analysis_result["diagnosis_analysis"],
             treatment_plan=analysis_result["treatment_plan"],
@@ -1144,6 +1246,9 @@ def direct_analysis_using_planner(req: DirectAnalysisRequest):
             analysis_method=analysis_result["analysis_method"],
             alzheimers_prediction=analysis_result["alzheimers_prediction"]
         )
+        if MSGPACK_AVAILABLE and accept and "application/msgpack" in accept:
+            return Response(msgpack.packb(response.model_dump()), media_type="application/msgpack")
+        return response
         
     except Exception as e:
         raise HTTPException(
@@ -47,6 +47,7 @@ class ReviewResponse(BaseModel):
     decision_applied: bool
     updated_treatment_plan: Optional[Dict[str, Any]] = None
     updated_chatbot_config: Optional[Dict[str, Any]] = None
+    current_treatment_plan: Optional[Dict[str, Any]] = None  # Only with ?include_current_plan=1
     message: str
 
 
@@ -109,8 +110,9 @@ def update_chatbot_config(patient_id: int, new_treatment_plan: Dict[str, Any]) -
 
     chatbot = patient_bot["chatbot"]
 
-    # Update treatment plan
+    # Update treatment plan; the chatbot no longer matches the config its ETag was issued for
     chatbot.treatment_plan = new_treatment_plan
+    patient_bot.pop("etag", None)
 
     # Regenerate treatment execution from updated plan
     chatbot.treatment_execution = _regenerate_treatment_execution(new_treatment_plan)
@@ -134,6 +136,12 @@ def update_chatbot_config(patient_id: int, new_treatment_plan: Dict[str, Any]) -
     return updated_config
 
 
+def _current_plan(patient_id: int) -> Optional[Dict[str, Any]]:
+    """Treatment plan the patient's chatbot is running now (None if no chatbot yet)"""
+    patient_bot = CHAT_DB.patient_chatbots.get(patient_id)
+    return patient_bot["chatbot"].treatment_plan if patient_bot else None
+
+
 def _regenerate_treatment_execution(treatment_plan: Dict[str, Any]) -> Dict[str, Any]:
     """Regenerate treatment execution structure from treatment plan"""
     from app.analysis.diagnosis_treatment_planning import DiagnosisTreatmentPlanner
@@ -177,7 +185,7 @@ def _extract_treatment_goals(treatment_plan: Dict[str, Any]) -> List[Dict[str, A
 # ==================== Endpoints ====================
 
 @router.post("/review/intake", response_model=ReviewResponse)
-def review_intake_analysis(review: IntakeAnalysisReview):
+def review_intake_analysis(review: IntakeAnalysisReview, include_current_plan: bool = False):
     """
     Doctor reviews intake analysis and makes treatment decisions
 
@@ -186,6 +194,9 @@ def review_intake_analysis(review: IntakeAnalysisReview):
     2. Receives doctor's decision and treatment changes
     3. Updates the patient's treatment plan if approved
     4. Updates the chatbot configuration with new treatment plan
+
+    With ?include_current_plan=1 the patient's current plan is echoed back in
+    current_treatment_plan, so no follow-up GET /current-plan is needed.
     """
 
     try:
@@ -228,6 +239,7 @@ def review_intake_analysis(review: IntakeAnalysisReview):
                 decision_applied=True,
                 updated_treatment_plan=updated_treatment_plan,
                 updated_chatbot_config=updated_chatbot_config,
+                current_treatment_plan=_current_plan(patient_id) if include_current_plan else None,
                 message=f"Intake review approved. Treatment plan and chatbot updated. Doctor notes: {decision.notes}"
             )
 
@@ -239,6 +251,7 @@ def review_intake_analysis(review: IntakeAnalysisReview):
                 decision_applied=True,
                 updated_treatment_plan=updated_treatment_plan,
                 updated_chatbot_config=None,
+                current_treatment_plan=_current_plan(patient_id) if include_current_plan else None,
                 message=f"Treatment plan updated. Chatbot not yet initialized. Doctor notes: {decision.notes}"
             )
 
@@ -250,7 +263,7 @@ def review_intake_analysis(review: IntakeAnalysisReview):
 
 
 @router.post("/review/conversation", response_model=ReviewResponse)
-def review_conversation_analysis(review: ConversationAnalysisReview):
+def review_conversation_analysis(review: ConversationAnalysisReview, include_current_plan: bool = False):
     """
     Doctor reviews conversation analysis and makes treatment decisions
 
@@ -259,6 +272,9 @@ def review_conversation_analysis(review: ConversationAnalysisReview):
     2. Receives doctor's decision and treatment adjustments
     3. Updates the patient's treatment plan if changes needed
     4. Updates the chatbot configuration with adjusted treatment
+
+    With ?include_current_plan=1 the patient's current plan is echoed back in
+    current_treatment_plan, so no follow-up GET /current-plan is needed.
     """
 
     try:
@@ -312,6 +328,7 @@ def review_conversation_analysis(review: ConversationAnalysisReview):
             decision_applied=True,
             updated_treatment_plan=updated_treatment_plan,
             updated_chatbot_config=updated_chatbot_config,
+            current_treatment_plan=_current_plan(patient_id) if include_current_plan else None,
             message=f"Conversation review approved. Treatment plan and chatbot updated based on symptom changes. "
                    f"Concern level: {llm_analysis.get('concern_level', 'N/A')}. "
                    f"Doctor notes: {decision.notes}"
@@ -327,12 +344,13 @@ def review_conversation_analysis(review: ConversationAnalysisReview):
 
 
 @router.post("/treatment/update", response_model=ReviewResponse)
-def update_treatment_plan_direct(update: TreatmentPlanUpdate):
+def update_treatment_plan_direct(update: TreatmentPlanUpdate, include_current_plan: bool = False):
     """
     Direct treatment plan update by doctor (without prior analysis review)
 
     This endpoint allows doctors to make direct updates to treatment plans,
     for example during regular check-ups or when adjusting ongoing care.
+    With ?include_current_plan=1 the updated plan is echoed back in current_treatment_plan.
     """
 
     try:
@@ -362,6 +380,7 @@ def update_treatment_plan_direct(update: TreatmentPlanUpdate):
             decision_applied=True,
             updated_treatment_plan=updated_treatment_plan,
             updated_chatbot_config=updated_chatbot_config,
+            current_treatment_plan=_current_plan(patient_id) if include_current_plan else None,
             message=f"Treatment plan updated directly. Reason: {update.reason}"
         )
 
@@ -8,46 +8,134 @@ Adds three endpoints:
 - GET  /api/patient/{patient_id}/intake/state?session_id= -> inspect session state
 
 This file can be merged into your existing `app.py` or imported as a router.
-It reuses the in-memory DB pattern from the earlier skeleton (you can swap to Postgres later).
+It reuses the in-memory DB pattern from the earlier skeleton; set REDIS_URL (with the
+`redis` package installed) to keep intake state in Redis instead, and ALERT_WEBHOOK_URL
+to forward auto-raised alerts to external endpoints.
 """
 
 from __future__ import annotations
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal, Callable, Tuple
 from datetime import datetime
-import re, uuid, threading
+from dataclasses import dataclass, field as dataclass_field
+import asyncio, logging, re, os, secrets
+import httpx
+import orjson
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="CognifyCare Intake Orchestrator")
 router = APIRouter(prefix="/api")
 
-# -------------------------- In-memory stores --------------------------
+# -------------------------- Stores --------------------------
+# Redis is optional: set REDIS_URL to share intake state across workers/replicas
+# and keep sessions across restarts. Without it everything stays in-process.
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+# Outbound alert webhooks are optional too: ALERT_WEBHOOK_URL may hold one or more
+# comma-separated endpoints (doctor queue, paging service, ...) that receive every
+# auto-raised alert as JSON.
+ALERT_WEBHOOK_URLS = [u.strip() for u in os.environ.get("ALERT_WEBHOOK_URL", "").split(",") if u.strip()]
+
+@dataclass(slots=True)
+class PatientRecord:
+    profile: Dict[str, Any]
+    long_term_memory: str = ""
+    chat_history: List[Dict[str, Any]] = dataclass_field(default_factory=list)
+    intake_history: List[Dict[str, Any]] = dataclass_field(default_factory=list)
+    routine_history: List[Dict[str, Any]] = dataclass_field(default_factory=list)
+    doctor_plan: Optional[Dict[str, Any]] = None
+    last_scores: Dict[str, Any] = dataclass_field(default_factory=lambda: {"mmse": None, "adl": None, "severity": None})
+    intake_snapshots: List[Dict[str, Any]] = dataclass_field(default_factory=list)
+
+    @classmethod
+    def new(cls, patient_id: int, now: Optional[str] = None) -> "PatientRecord":
+        return cls(profile={
+            "patient_id": patient_id,
+            "created_at": now or datetime.utcnow().isoformat(),
+            "timezone": "America/Los_Angeles",
+        })
+
+@dataclass(slots=True)
+class IntakeSession:
+    patient_id: int
+    created_at: str
+    answers: Dict[str, Any] = dataclass_field(default_factory=dict)
+    step_index: int = 0
+    finished: bool = False
+    summary: Optional[Dict[str, Any]] = None
+
 class MemoryStore:
-    def __init__(self):
-        self.patients: Dict[int, Dict[str, Any]] = {}
-        self.intake_sessions: Dict[str, Dict[str, Any]] = {}
+    def __init__(self) -> None:
+        self.patients: Dict[int, PatientRecord] = {}
+        self.intake_sessions: Dict[str, IntakeSession] = {}
         self.alerts: List[Dict[str, Any]] = []
-        self.lock = threading.Lock()
-
-    def get_or_create_patient(self, patient_id: int) -> Dict[str, Any]:
-        with self.lock:
-            if patient_id not in self.patients:
-                self.patients[patient_id] = {
-                    "profile": {
-                        "patient_id": patient_id,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "timezone": "America/Los_Angeles",
-                    },
-                    "long_term_memory": "",
-                    "chat_history": [],
-                    "intake_history": [],
-                    "routine_history": [],
-                    "doctor_plan": None,
-                    "last_scores": {"mmse": None, "adl": None, "severity": None},
-                }
-            return self.patients[patient_id]
-
-DB = MemoryStore()
+
+    # No lock: these methods never await, so on the event loop each one runs to
+    # completion, and the single-key dict ops they use are atomic under the GIL.
+    async def get_or_create_patient(self, patient_id: int, now: Optional[str] = None) -> PatientRecord:
+        patient = self.patients.get(patient_id)
+        if patient is None:
+            patient = self.patients.setdefault(patient_id, PatientRecord.new(patient_id, now))
+        return patient
+
+    async def save_patient(self, patient_id: int, patient: PatientRecord) -> None:
+        self.patients[patient_id] = patient
+
+    async def get_session(self, session_id: str) -> Optional[IntakeSession]:
+        return self.intake_sessions.get(session_id)
+
+    async def save_session(self, session_id: str, session: IntakeSession) -> None:
+        self.intake_sessions[session_id] = session
+
+    async def add_alert(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        alert["id"] = len(self.alerts)
+        self.alerts.append(alert)
+        return alert
+
+class RedisStore:
+    """Same interface as MemoryStore, backed by Redis (records stored as orjson-encoded JSON)."""
+
+    def __init__(self, url: str) -> None:
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def get_or_create_patient(self, patient_id: int, now: Optional[str] = None) -> PatientRecord:
+        key = f"patient:{patient_id}"
+        raw = await self.redis.get(key)
+        if raw is not None:
+            return PatientRecord(**orjson.loads(raw))
+        patient = PatientRecord.new(patient_id, now)
+        # NX: if another worker created it first, keep theirs
+        if not await self.redis.set(key, orjson.dumps(patient), nx=True):
+            raw = await self.redis.get(key)
+            if raw is not None:
+                return PatientRecord(**orjson.loads(raw))
+        return patient
+
+    async def save_patient(self, patient_id: int, patient: PatientRecord) -> None:
+        await self.redis.set(f"patient:{patient_id}", orjson.dumps(patient))
+
+    async def get_session(self, session_id: str) -> Optional[IntakeSession]:
+        raw = await self.redis.get(f"intake:{session_id}")
+        return IntakeSession(**orjson.loads(raw)) if raw is not None else None
+
+    async def save_session(self, session_id: str, session: IntakeSession) -> None:
+        await self.redis.set(f"intake:{session_id}", orjson.dumps(session))
+
+    async def add_alert(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        alert["id"] = await self.redis.incr("alerts:next_id") - 1
+        await self.redis.rpush("alerts", orjson.dumps(alert))
+        return alert
+
+DB = RedisStore(REDIS_URL) if REDIS_URL and REDIS_AVAILABLE else MemoryStore()
 
 # -------------------------- Question bank ----------------------------
 # Ordered list; each step asks one patient-friendly question and fills a dataset field.
@@ -107,6 +195,10 @@ class ReplyRequest(BaseModel):
     session_id: str
     message: str
 
+class ReplyBatchRequest(BaseModel):
+    session_id: str
+    messages: List[str]
+
 class ReplyResponse(BaseModel):
     session_id: str
     patient_id: int
@@ -126,27 +218,23 @@ class StateResponse(BaseModel):
     summary: Optional[Dict[str, Any]] = None
 
 # -------------------------- Helper parsing ----------------------------
-YES = {"y","yes","yeah","yep","true","sure"}
-NO  = {"n","no","nope","false"}
-SKIP= {"skip","unknown","unsure","dont know","don't know","na","n/a","idk"}
+YES = frozenset({"y","yes","yeah","yep","true","sure"})
+NO  = frozenset({"n","no","nope","false"})
+SKIP= frozenset({"skip","unknown","unsure","dont know","don't know","na","n/a","idk"})
+
+# One lookup per parse; SKIP tokens and unrecognised replies both map to None
+_BOOL_MAP: Dict[str, bool] = {**{w: True for w in YES}, **{w: False for w in NO}}
+_TRI_MAP: Dict[str, int] = {**{w: 1 for w in YES}, **{w: 0 for w in NO}}
 
 _ht_re = re.compile(r"(?:(?P<cm>\d{2,3})\s*cm)|(?:(?P<ft>\d)'?\s*(?P<inch>\d{1,2}) ?\")", re.I)
 _wt_re = re.compile(r"(?:(?P<kg>\d{2,3})\s*kg)|(?:(?P<lb>\d{2,3})\s*lb)\b", re.I)
 _num_re = re.compile(r"-?\d+(?:\.\d+)?")
 
 def parse_boolean(msg: str) -> Optional[bool]:
-    m = msg.strip().lower()
-    if m in YES: return True
-    if m in NO: return False
-    if m in SKIP: return None
-    return None
+    return _BOOL_MAP.get(msg.strip().lower())
 
 def parse_tristate(msg: str) -> Optional[int]:
-    m = msg.strip().lower()
-    if m in YES: return 1
-    if m in NO: return 0
-    if m in SKIP or m in {"unsure"}: return None
-    return None
+    return _TRI_MAP.get(msg.strip().lower())
 
 def parse_number(msg: str, minv: Optional[float]=None, maxv: Optional[float]=None) -> Optional[float]:
     m = _num_re.search(msg)
@@ -175,20 +263,107 @@ def parse_weight_kg(msg: str) -> Optional[float]:
     if m.group("lb"): return float(m.group("lb")) * 0.45359237
     return None
 
+# -------------------------- Reply parser ----------------------------
+# QUESTIONS is static, so at import we generate the source of a single
+# _parse_reply(idx, msg) -> (field, value): each question's field, type and
+# min/max are inlined as constants, and the branches form a balanced if-tree over idx.
+
+def _parse_expr(idx: int, q: Dict[str, Any], ns: Dict[str, Any]) -> List[str]:
+    """Source lines (without indentation) that parse `msg` for question idx and return (field, value)"""
+    qtype = q["type"]
+    field = q["field"]
+    if qtype == "boolean":
+        return [f"return {field!r}, parse_boolean(msg)"]
+    if qtype == "tristate":
+        return [f"return {field!r}, parse_tristate(msg)"]
+    if qtype == "number":
+        return [f"return {field!r}, parse_number(msg, {q.get('min')!r}, {q.get('max')!r})"]
+    if qtype == "choice":
+        # map and pattern are bound as globals of the generated code
+        # (a dict literal would be rebuilt on every call)
+        choices = {k.lower(): v for k, v in q.get("map", {}).items()}
+        ns[f"_choices_{idx}"] = choices
+        # all keys in one alternation, longest first, so "contains" is a single scan
+        ns[f"_choice_re_{idx}"] = re.compile("|".join(re.escape(k) for k in sorted(choices, key=len, reverse=True)))
+        return [
+            "m = msg.lower()",
+            f"v = _choices_{idx}.get(m)",
+            "if v is None:",
+            # try contains match (first option mentioned wins)
+            f"    found = _choice_re_{idx}.search(m)",
+            f"    v = _choices_{idx}[found.group()] if found else None",
+            f"return {field!r}, v",
+        ]
+    if qtype == "text":
+        if field == "HeightCm":
+            return [f"return {field!r}, parse_height_cm(msg)"]
+        if field == "WeightKg":
+            return [f"return {field!r}, parse_weight_kg(msg)"]
+        return [f"return {field!r}, (msg if msg.lower() not in SKIP else None)"]
+    return [f"return {field!r}, None"]
+
+def _dispatch_tree(lo: int, hi: int, indent: str, ns: Dict[str, Any]) -> List[str]:
+    if hi - lo == 1:
+        return [indent + line for line in _parse_expr(lo, QUESTIONS[lo], ns)]
+    mid = (lo + hi) // 2
+    return ([f"{indent}if idx < {mid}:"] + _dispatch_tree(lo, mid, indent + "    ", ns)
+            + _dispatch_tree(mid, hi, indent, ns))
+
+def _build_parse_reply() -> Callable[[int, str], Tuple[str, Any]]:
+    ns: Dict[str, Any] = {
+        "parse_boolean": parse_boolean, "parse_tristate": parse_tristate,
+        "parse_number": parse_number, "parse_height_cm": parse_height_cm,
+        "parse_weight_kg": parse_weight_kg, "SKIP": SKIP,
+    }
+    src = "\n".join(["def _parse_reply(idx, msg):"] + _dispatch_tree(0, len(QUESTIONS), "    ", ns))
+    exec(compile(src, "<intake._parse_reply>", "exec"), ns)
+    return ns["_parse_reply"]
+
+_parse_reply = _build_parse_reply()
+
+# Prompts and flags never change at runtime: freeze them once so the reply path
+# indexes a tuple instead of going through QUESTIONS[idx]["..."].
+_PROMPTS: Tuple[str, ...] = tuple(q["prompt"] for q in QUESTIONS)
+_REQUIRED: Tuple[bool, ...] = tuple(q.get("required", False) for q in QUESTIONS)
+_TOTAL = len(QUESTIONS)
+
 # -------------------------- Severity (stub) ----------------------------
 # Simple heuristic for demo; wire your ML/heuristic here
 
-def severity_infer(fields: Dict[str, Any]) -> Dict[str, Any]:
-    mmse = float(fields.get("MMSE", 0) or 0)
-    adl = float(fields.get("ADL", 100) or 100)
+SEVERITY_LABEL_NAMES = ("mild", "moderate", "severe")
+SEVERITY_LABELS = np.array(SEVERITY_LABEL_NAMES)
+_SEVERITY_BASE = np.array([0.2, 0.6, 0.9])
+
+def _severity_kernel(mmse: float, adl: float) -> Tuple[int, float]:
+    """Severity rule on plain floats -> (index into SEVERITY_LABEL_NAMES, score)"""
     if mmse >= 24:
-        label, sev = "mild", 0.2
+        idx, sev = 0, 0.2
     elif mmse >= 10:
-        label, sev = "moderate", 0.6
+        idx, sev = 1, 0.6
     else:
-        label, sev = "severe", 0.9
+        idx, sev = 2, 0.9
     if adl < 50: sev += 0.1
-    return {"severity_label": label, "severity_score": min(1.0, sev)}
+    return idx, min(1.0, sev)
+
+def severity_infer(fields: Dict[str, Any]) -> Dict[str, Any]:
+    mmse = float(fields.get("MMSE", 0) or 0)
+    adl = float(fields.get("ADL", 100) or 100)
+    idx, sev = _severity_kernel(mmse, adl)
+    return {"severity_label": SEVERITY_LABEL_NAMES[idx], "severity_score": sev}
+
+def severity_infer_batch(mmse: np.ndarray, adl: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized severity_infer for bulk scoring (e.g. many intake snapshots).
+    Takes (N,) MMSE and ADL arrays (NaN = missing) and returns (N,) label
+    indices into SEVERITY_LABELS and (N,) scores, using the same rules as
+    severity_infer.
+    """
+    mmse = np.nan_to_num(np.asarray(mmse, dtype=float), nan=0.0)
+    adl = np.asarray(adl, dtype=float)
+    adl = np.where(np.isnan(adl) | (adl == 0), 100.0, adl)
+    label_idx = np.where(mmse >= 24, 0, np.where(mmse >= 10, 1, 2))
+    sev = _SEVERITY_BASE[label_idx] + np.where(adl < 50, 0.1, 0.0)
+    return label_idx, np.minimum(sev, 1.0)
 
 # -------------------------- Orchestrator ----------------------------
 
@@ -197,157 +372,209 @@ def _first_prompt() -> str:
            "To get started, how old are you?"
 
 @router.post("/patient/{patient_id}/intake/start", response_model=StartResponse)
-def intake_start(patient_id: int):
-    DB.get_or_create_patient(patient_id)
-    session_id = uuid.uuid4().hex
-    DB.intake_sessions[session_id] = {
-        "patient_id": patient_id,
-        "created_at": datetime.utcnow().isoformat(),
-        "answers": {},
-        "step_index": 0,
-        "finished": False
-    }
+async def intake_start(patient_id: int) -> StartResponse:
+    # one timestamp per request, shared by the patient profile and the session
+    now = datetime.utcnow().isoformat()
+    await DB.get_or_create_patient(patient_id, now)
+    session_id = secrets.token_hex(16)
+    await DB.save_session(session_id, IntakeSession(patient_id=patient_id, created_at=now))
     prompt = _first_prompt()
-    return StartResponse(session_id=session_id, patient_id=patient_id, prompt=prompt, step_index=0, total_steps=len(QUESTIONS))
+    return StartResponse(session_id=session_id, patient_id=patient_id, prompt=prompt, step_index=0, total_steps=_TOTAL)
 
 @router.get("/patient/{patient_id}/intake/state", response_model=StateResponse)
-def intake_state(patient_id: int, session_id: str = Query(...)):
-    s = DB.intake_sessions.get(session_id)
-    if not s or s["patient_id"] != patient_id:
+async def intake_state(patient_id: int, session_id: str = Query(...)) -> StateResponse:
+    s = await DB.get_session(session_id)
+    if not s or s.patient_id != patient_id:
         raise HTTPException(404, "session not found")
     return StateResponse(
-        patient_id=s["patient_id"],
-        created_at=s["created_at"],
-        answers=s["answers"],
-        step_index=s["step_index"],
-        finished=s["finished"],
-        summary=s.get("summary")
+        patient_id=s.patient_id,
+        created_at=s.created_at,
+        answers=s.answers,
+        step_index=s.step_index,
+        finished=s.finished,
+        summary=s.summary
     )
 
-@router.post("/patient/{patient_id}/intake/reply", response_model=ReplyResponse)
-def intake_reply(patient_id: int, req: ReplyRequest):
-    s = DB.intake_sessions.get(req.session_id)
-    if not s or s["patient_id"] != patient_id:
-        raise HTTPException(404, "session not found for patient")
-    if s.get("finished"):
-        return ReplyResponse(session_id=req.session_id, patient_id=patient_id, saved={}, next_prompt=None, step_index=s["step_index"], total_steps=len(QUESTIONS), finished=True, summary=s.get("summary"))
+# -------------------------- Alert dispatch --------------------------
+# One pooled client for the whole process so repeated alerts reuse keep-alive
+# connections instead of paying a TCP/TLS handshake each time.
+_alert_client: Optional[Any] = None
+
+def _get_alert_client() -> Any:
+    global _alert_client
+    if _alert_client is None:
+        _alert_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _alert_client
+
+async def _post_alert(url: str, alert: Dict[str, Any]) -> None:
+    try:
+        resp = await _get_alert_client().post(url, content=orjson.dumps(alert), headers={"Content-Type": "application/json"})
+        resp.raise_for_status()
+    except Exception as e:
+        logger.warning("Alert webhook %s failed: %s", url, e)
+
+async def _dispatch_alert(alert: Dict[str, Any]) -> None:
+    """Fan an alert out to every configured webhook in parallel"""
+    if not ALERT_WEBHOOK_URLS:
+        return
+    await asyncio.gather(*(_post_alert(url, alert) for url in ALERT_WEBHOOK_URLS))
+
+async def _close_alert_client() -> None:
+    global _alert_client
+    if _alert_client is not None:
+        client, _alert_client = _alert_client, None
+        await client.aclose()
+
+router.add_event_handler("shutdown", _close_alert_client)
+
+async def _persist_completed_intake(patient_id: int, answers: Dict[str, Any], sev: Dict[str, Any]) -> None:
+    """Persist a completed intake to the patient record and raise an alert if needed (background task)"""
+    patient = await DB.get_or_create_patient(patient_id)
+    now = datetime.utcnow().isoformat()
+    # log transcript-lite into intake_history and long-term memory
+    patient.intake_history.append({"role":"assistant","text":"Intake completed.","ts":now})
+    # persist fields to a simple snapshot; in real DB, normalize
+    patient.intake_snapshots.append({"ts": now, "fields": answers})
 
-    idx = s["step_index"]
-    if idx >= len(QUESTIONS):
-        s["finished"] = True
-        return ReplyResponse(session_id=req.session_id, patient_id=patient_id, saved={}, next_prompt=None, step_index=idx, total_steps=len(QUESTIONS), finished=True, summary=s.get("summary"))
+    # Update last known scores (MMSE/ADL only if present) in a single write
+    scores = {"severity": sev["severity_score"]}
+    if answers.get("MMSE") is not None:
+        scores["mmse"] = answers["MMSE"]
+    if answers.get("ADL") is not None:
+        scores["adl"] = answers["ADL"]
+    patient.last_scores.update(scores)
 
-    q = QUESTIONS[idx]
-    field = q["field"]
-    msg = req.message.strip()
-
-    # parse according to type
-    value: Any = None
-    if q["type"] == "boolean":
-        value = parse_boolean(msg)
-    elif q["type"] == "tristate":
-        value = parse_tristate(msg)
-    elif q["type"] == "number":
-        value = parse_number(msg, q.get("min"), q.get("max"))
-    elif q["type"] == "choice":
-        m = msg.lower()
-        if m in q.get("map", {}):
-            value = q["map"][m]
-        else:
-            # try contains match
-            for k,v in q.get("map", {}).items():
-                if k in m:
-                    value = v; break
-    elif q["type"] == "text":
-        if field == "HeightCm":
-            value = parse_height_cm(msg)
-        elif field == "WeightKg":
-            value = parse_weight_kg(msg)
-        else:
-            value = msg if msg.lower() not in SKIP else None
+    await DB.save_patient(patient_id, patient)
+
+    # auto-alert if moderate/severe
+    if sev["severity_label"] in ("moderate","severe"):
+        alert = {
+            "patient_id": patient_id,
+            "kind": "intake_change",
+            "level": "medium" if sev["severity_label"]=="moderate" else "high",
+            "summary": f"Intake suggests {sev['severity_label']} severity",
+            "details": {"severity": sev, "answers": answers},
+            "created_at": now,
+            "hitl_status": "pending"
+        }
+        await DB.add_alert(alert)
+        await _dispatch_alert(alert)
+
+def _step_session(s: IntakeSession, session_id: str, patient_id: int, message: str) -> Tuple[ReplyResponse, bool, Optional[Dict[str, Any]]]:
+    """Apply one reply to the session in memory.
+
+    Returns the response, whether the session changed (and must be saved), and the
+    severity result when this reply completed the intake (to persist afterwards).
+    """
+    if s.finished:
+        return ReplyResponse(session_id=session_id, patient_id=patient_id, saved={}, next_prompt=None, step_index=s.step_index, total_steps=_TOTAL, finished=True, summary=s.summary), False, None
+
+    idx = s.step_index
+    if idx >= _TOTAL:
+        s.finished = True
+        return ReplyResponse(session_id=session_id, patient_id=patient_id, saved={}, next_prompt=None, step_index=idx, total_steps=_TOTAL, finished=True, summary=s.summary), True, None
+
+    msg = message.strip()
+
+    # parse according to the question's generated parser
+    field, value = _parse_reply(idx, msg)
 
     # validation & required handling
-    if value is None and q.get("required", False):
+    if value is None and _REQUIRED[idx]:
         # re-ask with a gentle nudge
         return ReplyResponse(
-            session_id=req.session_id,
+            session_id=session_id,
             patient_id=patient_id,
             saved={},
-            next_prompt=f"I might have missed that. {q['prompt']}",
+            next_prompt=f"I might have missed that. {_PROMPTS[idx]}",
             step_index=idx,
-            total_steps=len(QUESTIONS),
+            total_steps=_TOTAL,
             finished=False
-        )
+        ), False, None
 
     # save answer (can be None for optional)
-    s["answers"][field] = value
+    answers = s.answers
+    answers[field] = value
 
     # compute BMI if possible after weight
-    if field in ("WeightKg","BMI"):
-        ht = s["answers"].get("HeightCm")
-        wt = s["answers"].get("WeightKg")
-        bmi = s["answers"].get("BMI")
-        if bmi is None and ht and wt:
-            s["answers"]["BMI"] = round(wt / ((ht/100.0)**2), 2)
+    if field in ("WeightKg","BMI") and answers.get("BMI") is None:
+        ht = answers.get("HeightCm")
+        wt = answers.get("WeightKg")
+        if ht and wt:
+            h = ht / 100.0
+            answers["BMI"] = round(wt / (h * h), 2)
 
     # advance step
-    s["step_index"] = idx + 1
-    finished = s["step_index"] >= len(QUESTIONS)
+    s.step_index = idx + 1
+    finished = s.step_index >= _TOTAL
 
     if not finished:
-        next_q = QUESTIONS[s["step_index"]]
-        next_prompt = next_q["prompt"]
+        next_prompt = _PROMPTS[s.step_index]
         saved = {field: value}
-        return ReplyResponse(session_id=req.session_id, patient_id=patient_id, saved=saved, next_prompt=next_prompt, step_index=s["step_index"], total_steps=len(QUESTIONS), finished=False)
+        return ReplyResponse(session_id=session_id, patient_id=patient_id, saved=saved, next_prompt=next_prompt, step_index=s.step_index, total_steps=_TOTAL, finished=False), True, None
 
-    # finalize: persist to patient, run severity, craft summary
-    patient = DB.get_or_create_patient(patient_id)
-    # log transcript-lite into intake_history and long-term memory
-    now = datetime.utcnow().isoformat()
-    patient["intake_history"].append({"role":"assistant","text":"Intake completed.","ts":now})
-    # persist fields to a simple snapshot; in real DB, normalize
-    patient.setdefault("intake_snapshots", []).append({"ts": now, "fields": s["answers"]})
-
-    # Update last known scores if present
-    if s["answers"].get("MMSE") is not None:
-        patient["last_scores"]["mmse"] = s["answers"]["MMSE"]
-    if s["answers"].get("ADL") is not None:
-        patient["last_scores"]["adl"] = s["answers"]["ADL"]
-
-    sev = severity_infer(s["answers"])
-    patient["last_scores"]["severity"] = sev["severity_score"]
-
-    # auto-alert if moderate/severe
-    if sev["severity_label"] in ("moderate","severe"):
-        alert = {
-            "id": len(DB.alerts),
-            "patient_id": patient_id,
-            "kind": "intake_change",
-            "level": "medium" if sev["severity_label"]=="moderate" else "high",
-            "summary": f"Intake suggests {sev['severity_label']} severity",
-            "details": {"severity": sev, "answers": s["answers"]},
-            "created_at": now,
-            "hitl_status": "pending"
-        }
-        DB.alerts.append(alert)
+    # finalize: run severity and craft summary; persisting to the patient record
+    # and alerting happen after the response is sent
+    sev = severity_infer(answers)
 
-    s["finished"] = True
-    s["summary"] = {"answers": s["answers"], "severity": sev}
+    s.finished = True
+    s.summary = {"answers": answers, "severity": sev}
 
     return ReplyResponse(
-        session_id=req.session_id,
+        session_id=session_id,
         patient_id=patient_id,
         saved={field: value},
         next_prompt=None,
-        step_index=s["step_index"],
-        total_steps=len(QUESTIONS),
+        step_index=s.step_index,
+        total_steps=_TOTAL,
         finished=True,
-        summary=s["summary"]
-    )
+        summary=s.summary
+    ), True, sev
+
+@router.post("/patient/{patient_id}/intake/reply", response_model=ReplyResponse)
+async def intake_reply(patient_id: int, req: ReplyRequest, background: BackgroundTasks) -> ReplyResponse:
+    s = await DB.get_session(req.session_id)
+    if not s or s.patient_id != patient_id:
+        raise HTTPException(404, "session not found for patient")
+
+    reply, changed, sev = _step_session(s, req.session_id, patient_id, req.message)
+    if changed:
+        await DB.save_session(req.session_id, s)
+    if sev is not None:
+        background.add_task(_persist_completed_intake, patient_id, s.answers, sev)
+    return reply
+
+@router.post("/patient/{patient_id}/intake/reply_batch", response_model=List[ReplyResponse])
+async def intake_reply_batch(patient_id: int, req: ReplyBatchRequest, background: BackgroundTasks) -> List[ReplyResponse]:
+    """Apply several replies in order with one session load and one save.
+
+    Stops after the reply that finishes the intake; returns one response per reply applied.
+    """
+    s = await DB.get_session(req.session_id)
+    if not s or s.patient_id != patient_id:
+        raise HTTPException(404, "session not found for patient")
+
+    replies: List[ReplyResponse] = []
+    dirty = False
+    for message in req.messages:
+        reply, changed, sev = _step_session(s, req.session_id, patient_id, message)
+        replies.append(reply)
+        dirty = dirty or changed
+        if sev is not None:
+            background.add_task(_persist_completed_intake, patient_id, s.answers, sev)
+        if reply.finished:
+            break
+
+    if dirty:
+        await DB.save_session(req.session_id, s)
+    return replies
 
 app.include_router(router)
 
 # Root for quick check
 @app.get("/")
-def root():
-    return {"service": "CognifyCare Intake Orchestrator", "questions": len(QUESTIONS)}
+async def root() -> Dict[str, Any]:
+    return {"service": "CognifyCare Intake Orchestrator", "questions": _TOTAL}
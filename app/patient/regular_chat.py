@@ -4,22 +4,71 @@ Executes treatment plan through conversational interactions with patients
 """
 
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Deque, TypedDict, NotRequired
 from datetime import datetime, timedelta
-import uuid
+from collections import defaultdict, deque
+from itertools import chain
+import hashlib
+import secrets
+import time
 import threading
+import weakref
+import string
+import re
 import json
 
 router = APIRouter(prefix="/api/patient")
 
 # -------------------------- In-memory stores --------------------------
+class SessionState(TypedDict):
+    """Shape of a chat session; every key except the end-of-session ones is set at start"""
+    session_id: str
+    patient_id: int
+    chat_type: str
+    created_at: str
+    created_ts: float
+    current_activity_index: int
+    completed_activities: List[Dict[str, Any]]
+    interactions: Deque[Dict[str, Any]]
+    interaction_count: int
+    sentiment_counts: Dict[str, int]
+    engagement_sum: int
+    conversation_turns: int
+    last_activity_time: str
+    last_ts: float
+    status: NotRequired[str]
+    ended_at: NotRequired[str]
+    summary: NotRequired[Dict[str, Any]]
+
 class ChatStore:
     def __init__(self):
-        self.chat_sessions: Dict[str, Dict[str, Any]] = {}
+        self.chat_sessions: Dict[str, SessionState] = {}
         self.patient_chatbots: Dict[int, Dict[str, Any]] = {}
-        self.lock = threading.Lock()
+        # patient_id -> session ids in creation order, so history lookups don't
+        # have to scan every session in chat_sessions
+        self.patient_sessions: Dict[int, List[str]] = defaultdict(list)
+        # Locks are scoped to one session / one patient so unrelated requests never
+        # contend. Weak values drop a lock as soon as no request holds it; _meta_lock
+        # only guards creating them.
+        self.session_locks: weakref.WeakValueDictionary[str, threading.Lock] = weakref.WeakValueDictionary()
+        self.patient_locks: weakref.WeakValueDictionary[int, threading.Lock] = weakref.WeakValueDictionary()
+        self._meta_lock = threading.Lock()
+
+    def _get_lock(self, locks: weakref.WeakValueDictionary, key: Any) -> threading.Lock:
+        with self._meta_lock:
+            lock = locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                locks[key] = lock
+            return lock
+
+    def get_session_lock(self, session_id: str) -> threading.Lock:
+        return self._get_lock(self.session_locks, session_id)
+
+    def get_patient_lock(self, patient_id: int) -> threading.Lock:
+        return self._get_lock(self.patient_locks, patient_id)
 
 CHAT_DB = ChatStore()
 
@@ -76,29 +125,103 @@ class GetChatHistoryResponse(BaseModel):
     sessions: List[Dict[str, Any]]
 
 # -------------------------- Chatbot Logic --------------------------
+CHAT_TYPES = ("daily_check_in", "treatment_progress", "cognitive_engagement", "crisis_support")
+
+# Simple sentiment vocabularies, matched as whole words/phrases of the patient message
+POSITIVE_WORDS = frozenset({"yes", "good", "great", "fine", "okay", "sure", "done", "completed", "finished"})
+NEGATIVE_WORDS = frozenset({"no", "bad", "difficult", "hard", "can't", "cannot", "won't", "didn't", "haven't"})
+
+def _vocabulary_re(words: frozenset) -> re.Pattern:
+    # One alternation per vocabulary scans the message once however many entries
+    # (or multi-word phrases) it holds; longest first so phrases win over their prefixes
+    alternation = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b")
+
+_POSITIVE_RE = _vocabulary_re(POSITIVE_WORDS)
+_NEGATIVE_RE = _vocabulary_re(NEGATIVE_WORDS)
+# Punctuation other than apostrophes (can't, didn't) separates words
+_PUNCTUATION_TO_SPACE = str.maketrans({c: " " for c in string.punctuation if c != "'"})
+
+# Supportive follow-up for negative replies, by activity type
+NEGATIVE_FOLLOW_UPS = {
+    "medication": "Are you experiencing side effects, or is it difficult to remember?",
+    "physical_activity": "What's making the exercise difficult for you?",
+    "nutrition": "What challenges are you facing with your diet?",
+}
+
+_NEGATIVE_OPENING = ("I understand that {title} has been challenging. "
+                     "Let's talk about what specific difficulties you're experiencing. ")
+
+# Complete reply templates keyed by (sentiment, activity_completed, variant), where the
+# variant is the activity type for negative replies and whether the activity has a
+# chat prompt for neutral ones. (sentiment, completed, None) is the fallback.
+RESPONSE_TEMPLATES: Dict[Tuple[str, bool, Any], str] = {
+    ("positive", True, None): "That's wonderful! I'm glad to hear about your progress with {title}. "
+                              "Let me know if you need any help with the next step.",
+    ("positive", False, None): "That's wonderful! I'm glad to hear about your progress with {title}. "
+                               "How can I further support you with this?",
+    ("negative", False, None): _NEGATIVE_OPENING,
+    **{("negative", False, activity_type): _NEGATIVE_OPENING + follow_up
+       for activity_type, follow_up in NEGATIVE_FOLLOW_UPS.items()},
+    ("neutral", False, None): "Thank you for sharing. Can you tell me more about {title}?",
+    ("neutral", False, True): "Thank you for sharing. {prompt}",
+}
+
+def _response_template(sentiment: str, completed: bool, activity_type: str, has_prompt: bool) -> str:
+    """Chatbot reply template for a turn; {title} and {prompt} are filled in per activity"""
+    variant = has_prompt if sentiment == "neutral" else activity_type
+    return (RESPONSE_TEMPLATES.get((sentiment, completed, variant))
+            or RESPONSE_TEMPLATES[(sentiment, completed, None)])
+
+# Next steps only depend on the turn's outcome
+_NEXT_STEPS_COMPLETED = ("Move to next activity", "Continue check-in")
+_NEXT_STEPS_FOLLOW_UP = ("Discuss challenges", "Adjust activity", "Provide support")
+_NEXT_STEPS_CONTINUE = ("Continue discussion", "Clarify activity")
+
+# Only the most recent interactions are kept verbatim per session; the summary reads
+# rolling counters that cover the whole session
+MAX_SESSION_INTERACTIONS = 200
+ENGAGEMENT_POINTS = {"high": 3, "medium": 2, "low": 1}
+
 class TreatmentChatbot:
     """
-    Chatbot that executes treatment plan through daily check-in conversations
+    Chatbot that executes treatment plan through daily check-in conversations.
+    All per-conversation state lives in the session dict, so one slotted
+    instance per patient only holds the plan/config it was built from.
     """
 
+    __slots__ = (
+        "patient_id", "patient_portfolio", "treatment_plan", "chatbot_config",
+        "chatbot_id", "created_at", "conversation_flows", "monitoring_schedule",
+        "treatment_goals", "_treatment_execution", "_activities_by_type",
+    )
+
     def __init__(self, patient_id: int, patient_portfolio: Dict[str, Any],
                  treatment_plan: Dict[str, Any], chatbot_config: Dict[str, Any]):
         self.patient_id = patient_id
         self.patient_portfolio = patient_portfolio
         self.treatment_plan = treatment_plan
         self.chatbot_config = chatbot_config
-        self.chatbot_id = uuid.uuid4().hex
+        self.chatbot_id = secrets.token_hex(16)
         self.created_at = datetime.utcnow().isoformat()
 
         # Extract conversation flows and treatment execution from config
+        # (assigning treatment_execution also builds the per-chat-type activity lists)
         self.conversation_flows = chatbot_config.get("conversation_flows", {})
         self.treatment_execution = chatbot_config.get("treatment_execution", {})
         self.monitoring_schedule = chatbot_config.get("monitoring_schedule", {})
         self.treatment_goals = chatbot_config.get("treatment_goals", [])
 
-        # Track patient progress
-        self.completed_activities = []
-        self.activity_metrics = {}
+    @property
+    def treatment_execution(self) -> Dict[str, Any]:
+        return self._treatment_execution
+
+    @treatment_execution.setter
+    def treatment_execution(self, value: Dict[str, Any]) -> None:
+        # Activities only depend on treatment_execution, so resolve them once here
+        # (and again if the doctor review swaps in a new plan) instead of per message
+        self._treatment_execution = value
+        self._activities_by_type = {ct: self._compute_activities(ct) for ct in CHAT_TYPES}
 
     def start_conversation(self, chat_type: str = "daily_check_in") -> Dict[str, Any]:
         """Start a new conversation based on chat type"""
@@ -125,12 +248,13 @@ class TreatmentChatbot:
             "purpose": flow.get("purpose", "Wellness check")
         }
 
-    def process_patient_message(self, session: Dict[str, Any], patient_message: str) -> Dict[str, Any]:
+    def process_patient_message(self, session: SessionState, patient_message: str,
+                                now: Optional[str] = None) -> Dict[str, Any]:
         """Process patient message and generate appropriate response"""
 
         # Get current activity being discussed
-        current_activity_index = session.get("current_activity_index", 0)
-        chat_type = session.get("chat_type", "daily_check_in")
+        current_activity_index = session["current_activity_index"]
+        chat_type = session["chat_type"]
 
         # Get activities for the current chat type
         activities = self._get_activities_for_chat_type(chat_type)
@@ -158,31 +282,41 @@ class TreatmentChatbot:
             patient_message
         )
 
+        # One timestamp for everything recorded about this message
+        if now is None:
+            now = datetime.utcnow().isoformat()
+
         # Track activity progress
         if response_analysis.get("activity_completed", False):
             session["current_activity_index"] += 1
             session["completed_activities"].append({
                 "activity_id": current_activity.get("id"),
                 "activity_title": current_activity.get("title"),
-                "completion_time": datetime.utcnow().isoformat(),
+                "completion_time": now,
                 "patient_response": patient_message,
                 "metrics": response_analysis.get("metrics", {})
             })
 
         # Update session
         session["conversation_turns"] += 1
-        session["last_activity_time"] = datetime.utcnow().isoformat()
+        session["last_activity_time"] = now
+        session["last_ts"] = time.time()
 
         return {
             "message": chatbot_response["message"],
             "activity_completed": response_analysis.get("activity_completed", False),
             "conversation_complete": session["current_activity_index"] >= len(activities),
             "follow_up_questions": chatbot_response.get("follow_up_questions", []),
-            "next_steps": chatbot_response.get("next_steps", [])
+            "next_steps": chatbot_response.get("next_steps", []),
+            "response_analysis": response_analysis
         }
 
     def _get_activities_for_chat_type(self, chat_type: str) -> List[Dict[str, Any]]:
         """Get activities relevant to the chat type"""
+        return self._activities_by_type.get(chat_type, [])
+
+    def _compute_activities(self, chat_type: str) -> List[Dict[str, Any]]:
+        """Collect activities relevant to the chat type from treatment_execution"""
 
         if chat_type == "daily_check_in":
             # Return daily check-in activities from treatment execution
@@ -203,21 +337,13 @@ class TreatmentChatbot:
 
             # If no activities found, add from any available category
             if not activities:
-                for category_items in self.treatment_execution.values():
-                    if isinstance(category_items, list):
-                        for activity in category_items:
-                            if isinstance(activity, dict):
-                                activities.append(activity)
+                activities = self._all_activities()
 
             return activities[:5]  # Limit to 5 activities per daily check-in
 
         elif chat_type == "treatment_progress":
             # Return all treatment activities for weekly review
-            activities = []
-            for category in self.treatment_execution.values():
-                if isinstance(category, list):
-                    activities.extend([a for a in category if isinstance(a, dict)])
-            return activities
+            return self._all_activities()
 
         elif chat_type == "cognitive_engagement":
             # Return cognitive activities
@@ -239,17 +365,20 @@ class TreatmentChatbot:
 
         return []
 
+    def _all_activities(self) -> List[Dict[str, Any]]:
+        """Every activity across all treatment_execution categories, in one flat pass"""
+        categories = (c for c in self.treatment_execution.values() if isinstance(c, list))
+        return [a for a in chain.from_iterable(categories) if isinstance(a, dict)]
+
     def _analyze_patient_response(self, patient_message: str, activity: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze patient response to determine activity completion and sentiment"""
 
         message_lower = patient_message.lower().strip()
 
-        # Simple sentiment analysis
-        positive_words = ["yes", "good", "great", "fine", "okay", "sure", "done", "completed", "finished"]
-        negative_words = ["no", "bad", "difficult", "hard", "can't", "cannot", "won't", "didn't", "haven't"]
-
-        has_positive = any(word in message_lower for word in positive_words)
-        has_negative = any(word in message_lower for word in negative_words)
+        # Simple sentiment analysis on whole words (so "no" doesn't match "know")
+        has_positive = _POSITIVE_RE.search(message_lower) is not None
+        has_negative = _NEGATIVE_RE.search(message_lower) is not None
+        word_count = len(message_lower.translate(_PUNCTUATION_TO_SPACE).split())
 
         # Determine if activity is completed based on response
         activity_completed = has_positive and not has_negative
@@ -257,7 +386,7 @@ class TreatmentChatbot:
         # Extract metrics
         metrics = {
             "sentiment": "positive" if has_positive else "negative" if has_negative else "neutral",
-            "engagement_level": "high" if len(patient_message.split()) > 5 else "medium" if len(patient_message.split()) > 2 else "low",
+            "engagement_level": "high" if word_count > 5 else "medium" if word_count > 2 else "low",
             "response_length": len(patient_message)
         }
 
@@ -278,34 +407,17 @@ class TreatmentChatbot:
         chat_prompts = activity.get("chat_prompts", [])
         follow_up_questions = activity.get("follow_up_questions", [])
 
-        # Generate appropriate response based on sentiment
-        if response_analysis["sentiment"] == "positive":
-            message = f"That's wonderful! I'm glad to hear about your progress with {activity_title}. "
-
-            if response_analysis.get("activity_completed"):
-                message += "Let me know if you need any help with the next step."
-            else:
-                message += "How can I further support you with this?"
-
-        elif response_analysis["sentiment"] == "negative":
-            message = f"I understand that {activity_title} has been challenging. "
-            message += "Let's talk about what specific difficulties you're experiencing. "
-
-            # Add supportive follow-up
-            if activity_type == "medication":
-                message += "Are you experiencing side effects, or is it difficult to remember?"
-            elif activity_type == "physical_activity":
-                message += "What's making the exercise difficult for you?"
-            elif activity_type == "nutrition":
-                message += "What challenges are you facing with your diet?"
-
-        else:  # neutral
-            message = f"Thank you for sharing. "
-            if chat_prompts:
-                # Use next prompt from the activity
-                message += chat_prompts[min(1, len(chat_prompts)-1)]
-            else:
-                message += f"Can you tell me more about {activity_title}?"
+        # Generate appropriate response based on sentiment; the wording only depends
+        # on a few flags, so pick the prebuilt template and fill in the activity
+        template = _response_template(
+            response_analysis["sentiment"],
+            bool(response_analysis.get("activity_completed")),
+            activity_type,
+            bool(chat_prompts)
+        )
+        # Use next prompt from the activity for neutral replies
+        prompt = chat_prompts[min(1, len(chat_prompts)-1)] if chat_prompts else ""
+        message = template.format_map({"title": activity_title, "prompt": prompt})
 
         return {
             "message": message,
@@ -318,42 +430,29 @@ class TreatmentChatbot:
         """Generate next steps based on activity and response"""
 
         if response_analysis.get("activity_completed"):
-            return ["Move to next activity", "Continue check-in"]
+            return list(_NEXT_STEPS_COMPLETED)
 
         if response_analysis.get("needs_follow_up"):
-            return ["Discuss challenges", "Adjust activity", "Provide support"]
+            return list(_NEXT_STEPS_FOLLOW_UP)
 
-        return ["Continue discussion", "Clarify activity"]
+        return list(_NEXT_STEPS_CONTINUE)
 
-    def get_session_summary(self, session: Dict[str, Any]) -> Dict[str, Any]:
+    def get_session_summary(self, session: SessionState) -> Dict[str, Any]:
         """Generate summary of chat session"""
 
-        completed_activities = session.get("completed_activities", [])
-        interactions = session.get("interactions", [])
+        completed_activities = session["completed_activities"]
 
         # Calculate metrics
         total_activities = len(completed_activities)
-        total_interactions = len(interactions)
-        session_duration = (
-            datetime.fromisoformat(session.get("last_activity_time", session["created_at"])) -
-            datetime.fromisoformat(session["created_at"])
-        ).total_seconds() / 60  # in minutes
-
-        # Analyze sentiment across interactions
-        sentiments = []
-        for interaction in interactions:
-            if "response_analysis" in interaction:
-                sentiments.append(interaction["response_analysis"].get("sentiment", "neutral"))
-
-        sentiment_summary = {
-            "positive": sentiments.count("positive"),
-            "negative": sentiments.count("negative"),
-            "neutral": sentiments.count("neutral")
-        }
+        total_interactions = session["interaction_count"]
+        session_duration = (session["last_ts"] - session["created_ts"]) / 60  # in minutes
+
+        # Sentiment across interactions (counted as messages arrive)
+        sentiment_summary = dict(session["sentiment_counts"])
 
         return {
             "session_id": session["session_id"],
-            "chat_type": session.get("chat_type"),
+            "chat_type": session["chat_type"],
             "duration_minutes": round(session_duration, 2),
             "total_activities": total_activities,
             "total_interactions": total_interactions,
@@ -370,21 +469,15 @@ class TreatmentChatbot:
             "recommendations": self._generate_recommendations(session)
         }
 
-    def _calculate_engagement_score(self, session: Dict[str, Any]) -> str:
+    def _calculate_engagement_score(self, session: SessionState) -> str:
         """Calculate overall engagement score for the session"""
 
-        interactions = session.get("interactions", [])
-        if not interactions:
+        interaction_count = session["interaction_count"]
+        if not interaction_count:
             return "low"
 
-        # Calculate based on response lengths and sentiment
-        total_score = 0
-        for interaction in interactions:
-            if "response_analysis" in interaction:
-                engagement = interaction["response_analysis"].get("metrics", {}).get("engagement_level", "low")
-                total_score += {"high": 3, "medium": 2, "low": 1}.get(engagement, 1)
-
-        avg_score = total_score / len(interactions)
+        # Calculate based on response lengths (summed as messages arrive)
+        avg_score = session["engagement_sum"] / interaction_count
 
         if avg_score >= 2.5:
             return "high"
@@ -393,7 +486,7 @@ class TreatmentChatbot:
         else:
             return "low"
 
-    def _generate_recommendations(self, session: Dict[str, Any]) -> List[str]:
+    def _generate_recommendations(self, session: SessionState) -> List[str]:
         """Generate recommendations based on session"""
 
         recommendations = []
@@ -404,16 +497,13 @@ class TreatmentChatbot:
             recommendations.append("Consider shorter, more frequent check-ins")
             recommendations.append("Use more visual cues and simple language")
 
-        completed_count = len(session.get("completed_activities", []))
+        completed_count = len(session["completed_activities"])
         if completed_count < 3:
             recommendations.append("Focus on fewer activities per session")
             recommendations.append("Provide more encouragement and positive reinforcement")
 
-        # Check sentiment
-        negative_responses = sum(
-            1 for i in session.get("interactions", [])
-            if i.get("response_analysis", {}).get("sentiment") == "negative"
-        )
+        # Check sentiment (counted as messages arrive)
+        negative_responses = session["sentiment_counts"]["negative"]
 
         if negative_responses > 2:
             recommendations.append("Follow up with caregiver about challenges")
@@ -423,14 +513,29 @@ class TreatmentChatbot:
 
 # -------------------------- Endpoints --------------------------
 
+def _config_etag(req: InitializeChatbotRequest) -> str:
+    """Strong ETag over the portfolio, plan and config a chatbot was built from"""
+    blob = json.dumps([req.patient_portfolio, req.treatment_plan, req.chatbot_config], sort_keys=True, default=str)
+    return '"%s"' % hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
 @router.post("/{patient_id}/chatbot/initialize", response_model=InitializeChatbotResponse)
-def initialize_chatbot(patient_id: int, req: InitializeChatbotRequest):
+def initialize_chatbot(patient_id: int, req: InitializeChatbotRequest, response: Response,
+                       if_none_match: Optional[str] = Header(None)):
     """
     Initialize a treatment chatbot for a patient using their portfolio,
-    treatment plan, and chatbot config from diagnosis_treatment_planning
+    treatment plan, and chatbot config from diagnosis_treatment_planning.
+
+    Clients that send back the ETag of an earlier initialization get a 304 (with the
+    current chatbot id in X-Chatbot-Id) while the request body still matches that ETag
+    and the patient's chatbot is still the one built from that configuration.
     """
 
-    with CHAT_DB.lock:
+    etag = _config_etag(req)
+    with CHAT_DB.get_patient_lock(patient_id):
+        existing = CHAT_DB.patient_chatbots.get(patient_id)
+        if if_none_match == etag and existing and existing.get("etag") == etag:
+            return Response(status_code=304, headers={"ETag": etag, "X-Chatbot-Id": existing["chatbot_id"]})
+
         # Create chatbot instance
         chatbot = TreatmentChatbot(
             patient_id=patient_id,
@@ -444,9 +549,11 @@ def initialize_chatbot(patient_id: int, req: InitializeChatbotRequest):
             "chatbot": chatbot,
             "chatbot_id": chatbot.chatbot_id,
             "created_at": chatbot.created_at,
-            "status": "active"
+            "status": "active",
+            "etag": etag
         }
 
+    response.headers["ETag"] = etag
     return InitializeChatbotResponse(
         patient_id=patient_id,
         chatbot_id=chatbot.chatbot_id,
@@ -470,22 +577,30 @@ def start_chat_session(patient_id: int, req: StartChatRequest):
     # Start conversation
     conversation_context = chatbot.start_conversation(req.chat_type)
 
-    # Create session
-    session_id = uuid.uuid4().hex
-    session = {
+    # Create session; ISO strings are for display, epoch seconds for duration math
+    session_id = secrets.token_hex(16)
+    now = datetime.utcnow().isoformat()
+    now_ts = time.time()
+    session: SessionState = {
         "session_id": session_id,
         "patient_id": patient_id,
         "chat_type": req.chat_type,
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": now,
+        "created_ts": now_ts,
         "current_activity_index": 0,
         "completed_activities": [],
-        "interactions": [],
+        "interactions": deque(maxlen=MAX_SESSION_INTERACTIONS),
+        "interaction_count": 0,
+        "sentiment_counts": {"positive": 0, "negative": 0, "neutral": 0},
+        "engagement_sum": 0,
         "conversation_turns": 0,
-        "last_activity_time": datetime.utcnow().isoformat()
+        "last_activity_time": now,
+        "last_ts": now_ts
     }
 
-    with CHAT_DB.lock:
+    with CHAT_DB.get_patient_lock(patient_id):
         CHAT_DB.chat_sessions[session_id] = session
+        CHAT_DB.patient_sessions[patient_id].append(session_id)
 
     return StartChatResponse(
         session_id=session_id,
@@ -501,7 +616,10 @@ def send_chat_message(req: ChatMessageRequest):
     Send a patient message and receive chatbot response
     """
 
-    session = CHAT_DB.chat_sessions.get(req.session_id)
+    session_id = req.session_id
+    patient_message = req.patient_message
+
+    session = CHAT_DB.chat_sessions.get(session_id)
     if not session:
         raise HTTPException(404, "Chat session not found")
 
@@ -512,32 +630,53 @@ def send_chat_message(req: ChatMessageRequest):
 
     chatbot: TreatmentChatbot = patient_bot["chatbot"]
 
-    # Process patient message
-    response = chatbot.process_patient_message(session, req.patient_message)
-
-    # Store interaction
-    interaction = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "patient_message": req.patient_message,
-        "chatbot_response": response["message"],
-        "response_analysis": {
-            "activity_completed": response.get("activity_completed"),
-            "sentiment": "neutral"  # Would be extracted from response analysis
-        }
+    with CHAT_DB.get_session_lock(session_id):
+        # Process patient message (advances the session's activity state); the
+        # timestamp is formatted once and shared with the interaction record
+        now = datetime.utcnow().isoformat()
+        response = chatbot.process_patient_message(session, patient_message, now)
+        chatbot_message = response["message"]
+        activity_completed = response.get("activity_completed")
+
+        # Wrap-up turns after the last activity aren't analyzed and count as neutral
+        analysis = response.get("response_analysis", {})
+        sentiment = analysis.get("sentiment", "neutral")
+        metrics = analysis.get("metrics", {})
+
+        # Store interaction. Once the log is full its oldest entry is about to be
+        # dropped, so recycle that dict (and its analysis dict) instead of
+        # allocating fresh ones every message
+        interactions = session["interactions"]
+        if len(interactions) == interactions.maxlen:
+            interaction = interactions.popleft()
+            interaction_analysis = interaction["response_analysis"]
+        else:
+            interaction = {}
+            interaction_analysis = {}
+        interaction_analysis["activity_completed"] = activity_completed
+        interaction_analysis["sentiment"] = sentiment
+        interaction_analysis["metrics"] = metrics
+        interaction["timestamp"] = now
+        interaction["patient_message"] = patient_message
+        interaction["chatbot_response"] = chatbot_message
+        interaction["response_analysis"] = interaction_analysis
+        interactions.append(interaction)
+
+        # Keep the session aggregates current so summaries don't rescan interactions
+        session["interaction_count"] += 1
+        session["sentiment_counts"][sentiment] += 1
+        session["engagement_sum"] += ENGAGEMENT_POINTS.get(metrics.get("engagement_level", "low"), 1)
+
+    # Plain dict: validated and serialized once via response_model
+    return {
+        "session_id": session_id,
+        "chatbot_message": chatbot_message,
+        "follow_up_questions": response.get("follow_up_questions"),
+        "activity_completed": activity_completed,
+        "conversation_complete": response.get("conversation_complete", False),
+        "next_steps": response.get("next_steps")
     }
 
-    with CHAT_DB.lock:
-        session["interactions"].append(interaction)
-
-    return ChatMessageResponse(
-        session_id=req.session_id,
-        chatbot_message=response["message"],
-        follow_up_questions=response.get("follow_up_questions"),
-        activity_completed=response.get("activity_completed"),
-        conversation_complete=response.get("conversation_complete", False),
-        next_steps=response.get("next_steps")
-    )
-
 @router.post("/chat/end", response_model=EndChatResponse)
 def end_chat_session(req: EndChatRequest):
     """
@@ -555,8 +694,14 @@ def end_chat_session(req: EndChatRequest):
 
     chatbot: TreatmentChatbot = patient_bot["chatbot"]
 
-    # Generate session summary
-    chat_summary = chatbot.get_session_summary(session)
+    with CHAT_DB.get_session_lock(req.session_id):
+        # Generate session summary
+        chat_summary = chatbot.get_session_summary(session)
+
+        # Mark session as completed
+        session["status"] = "completed"
+        session["ended_at"] = datetime.utcnow().isoformat()
+        session["summary"] = chat_summary
 
     # Compile metrics
     metrics = {
@@ -567,20 +712,17 @@ def end_chat_session(req: EndChatRequest):
         "sentiment_distribution": chat_summary["sentiment_summary"]
     }
 
-    # Mark session as completed
-    with CHAT_DB.lock:
-        session["status"] = "completed"
-        session["ended_at"] = datetime.utcnow().isoformat()
-        session["summary"] = chat_summary
-
-    return EndChatResponse(
-        session_id=req.session_id,
-        patient_id=patient_id,
-        chat_summary=chat_summary,
-        interactions=session["interactions"],
-        completed_activities=[a["activity_title"] for a in session["completed_activities"]],
-        metrics=metrics
-    )
+    # Payload is already plain dicts; returning it as-is lets FastAPI validate and
+    # serialize it once against response_model instead of building the model here
+    # and dumping/re-validating it on the way out
+    return {
+        "session_id": req.session_id,
+        "patient_id": patient_id,
+        "chat_summary": chat_summary,
+        "interactions": list(session["interactions"]),
+        "completed_activities": [a["activity_title"] for a in session["completed_activities"]],
+        "metrics": metrics
+    }
 
 @router.get("/{patient_id}/chat/history", response_model=GetChatHistoryResponse)
 def get_chat_history(patient_id: int, limit: int = 10):
@@ -588,36 +730,33 @@ def get_chat_history(patient_id: int, limit: int = 10):
     Get chat history for a patient
     """
 
-    # Get all sessions for this patient
-    patient_sessions = [
-        s for s in CHAT_DB.chat_sessions.values()
-        if s["patient_id"] == patient_id
-    ]
-
-    # Sort by created_at descending
-    patient_sessions.sort(key=lambda x: x["created_at"], reverse=True)
+    # Session ids for this patient, oldest first
+    session_ids = CHAT_DB.patient_sessions.get(patient_id, [])
 
-    # Limit results
-    limited_sessions = patient_sessions[:limit]
+    # Newest first, limited: step backwards from the end so only `limit` ids are
+    # copied (same result as session_ids[::-1][:limit] for any limit)
+    limited_ids = session_ids[:-limit - 1:-1]
 
     # Format sessions
     formatted_sessions = []
-    for session in limited_sessions:
+    for session_id in limited_ids:
+        session = CHAT_DB.chat_sessions[session_id]
         formatted_sessions.append({
             "session_id": session["session_id"],
             "chat_type": session["chat_type"],
             "created_at": session["created_at"],
             "status": session.get("status", "active"),
-            "completed_activities_count": len(session.get("completed_activities", [])),
-            "total_interactions": len(session.get("interactions", [])),
+            "completed_activities_count": len(session["completed_activities"]),
+            "total_interactions": session["interaction_count"],
             "summary": session.get("summary")
         })
 
-    return GetChatHistoryResponse(
-        patient_id=patient_id,
-        total_sessions=len(patient_sessions),
-        sessions=formatted_sessions
-    )
+    # Plain dict: validated and serialized once via response_model
+    return {
+        "patient_id": patient_id,
+        "total_sessions": len(session_ids),
+        "sessions": formatted_sessions
+    }
 
 @router.get("/{patient_id}/chatbot/status")
 def get_chatbot_status(patient_id: int):
@@ -635,12 +774,18 @@ def get_chatbot_status(patient_id: int):
 
     chatbot: TreatmentChatbot = patient_bot["chatbot"]
 
+    # Progress is recorded per session, so total it across the patient's sessions
+    total_activities_tracked = sum(
+        len(CHAT_DB.chat_sessions[sid]["completed_activities"])
+        for sid in CHAT_DB.patient_sessions.get(patient_id, [])
+    )
+
     return {
         "patient_id": patient_id,
         "chatbot_id": chatbot.chatbot_id,
         "status": patient_bot["status"],
         "created_at": patient_bot["created_at"],
-        "total_activities_tracked": len(chatbot.completed_activities),
+        "total_activities_tracked": total_activities_tracked,
         "treatment_goals_count": len(chatbot.treatment_goals),
         "monitoring_schedule": chatbot.monitoring_schedule
     }
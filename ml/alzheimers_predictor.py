@@ -1,137 +1,521 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+
+# Optional Intel oneDAL backend for the random forest (pip install
+# "scikit-learn-intelex>=2023.0.2"); must be patched in before sklearn.ensemble is imported
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn(["random_forest_classifier"])
+    SKLEARNEX_AVAILABLE = True
+except ImportError:
+    SKLEARNEX_AVAILABLE = False
+
+# Optional compiled tree walker for batched prediction; NumPy is used otherwise
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional GPU inference through cuML's Forest Inference Library (needs a CUDA device)
+try:
+    import cupy
+    from cuml import ForestInference
+    CUML_AVAILABLE = True
+except ImportError:
+    CUML_AVAILABLE = False
+
+from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+import csv
+import hashlib
 import joblib
+import json
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+# Dataset columns that are identifiers rather than predictive features
+NON_FEATURE_COLUMNS = frozenset({'PatientID', 'DoctorInCharge'})
+
+def build_forest(n_estimators, max_depth, random_state=42, n_jobs=-1):
+    """RandomForestClassifier with the project's fixed hyperparameters and the given size"""
+    return RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=random_state,
+        class_weight='balanced',
+        n_jobs=n_jobs
+    )
+
+def select_forest_size(X, y, n_estimators_grid=(25, 50, 100), max_depth_grid=(4, 6, 8, 10),
+                       tolerance=0.005, cv=3, random_state=42, n_jobs=-1):
+    """Pick the cheapest (n_estimators, max_depth) within `tolerance` of the best CV accuracy
+
+    Prediction walks every tree level by level, so its cost grows with trees x depth.
+    Returns the chosen size and the mean cross-validated accuracy of every grid point.
+    """
+    scores = {}
+    for n_estimators in n_estimators_grid:
+        for max_depth in max_depth_grid:
+            model = build_forest(n_estimators, max_depth, random_state=random_state, n_jobs=n_jobs)
+            scores[(n_estimators, max_depth)] = cross_val_score(model, X, y, cv=cv).mean()
+
+    best = max(scores.values())
+    candidates = [size for size, score in scores.items() if score >= best - tolerance]
+    return min(candidates, key=lambda size: (size[0] * size[1], size)), scores
+
+# Batches at least this large go to the GPU when FIL is loaded; smaller ones stay on the
+# CPU so single-patient latency doesn't pay for host/device transfers
+FIL_MIN_BATCH = 32
+
+# Batches up to this many rows are walked by the serial numba kernel; a parallel launch
+# costs more than it saves for them
+NUMBA_SERIAL_ROWS = 1
+
+# Batches up to this many rows are quantized with a single dense compare
+QUANTIZE_COMPARE_ROWS = 16
+
+def pack_forest(model):
+    """Flatten a fitted RandomForestClassifier into contiguous node arrays
+
+    All trees share one set of arrays (structure-of-arrays); child indices are global and
+    interleaved as children[node] = (left, right), so the comparison result picks the next
+    node with a single load. -1 marks leaves, and each leaf holds its normalized class
+    distribution.
+
+    Thresholds are quantized losslessly: the bin edges of a feature are the distinct
+    thresholds the forest splits it on, and each node stores the index of its threshold
+    among them. A value x then satisfies x <= threshold exactly when fewer than
+    (index + 1) edges lie below x, so the descent only compares small integers.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    def children(tree, offset, attr):
+        child = getattr(tree, attr)
+        return np.where(child >= 0, child + offset, -1)
+
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+    totals = value.sum(axis=1, keepdims=True)
+    totals[totals == 0.0] = 1.0
+    # Leaf distributions are stored as float32 (half the bytes) and averaged in float64
+    value = (value / totals).astype(np.float32)
+
+    feature = np.concatenate([tree.feature for tree in trees])
+    threshold = np.concatenate([tree.threshold for tree in trees])
+    split = feature >= 0
+
+    # Distinct (feature, threshold) pairs, sorted by feature then threshold
+    pairs, pair_index = np.unique(
+        np.column_stack([feature[split], threshold[split]]), axis=0, return_inverse=True
+    )
+    edge_feature = pairs[:, 0].astype(np.intp)
+    edge_offsets = np.searchsorted(edge_feature, np.arange(model.n_features_in_ + 1))
+    bin_dtype = np.min_scalar_type(int(np.diff(edge_offsets).max()))
+
+    threshold_bin = np.zeros(len(feature), dtype=bin_dtype)
+    threshold_bin[split] = pair_index.reshape(-1) - edge_offsets[feature[split]]
+
+    return {
+        # Leaves never compare, so their feature slot is just set to 0
+        'feature': np.where(split, feature, 0).astype(np.min_scalar_type(model.n_features_in_ - 1)),
+        'threshold_bin': threshold_bin,
+        'edges': pairs[:, 1].copy(),
+        'edge_feature': edge_feature,
+        'edge_offsets': edge_offsets,
+        'children': np.column_stack([
+            np.concatenate([children(t, o, 'children_left') for t, o in zip(trees, offsets)]),
+            np.concatenate([children(t, o, 'children_right') for t, o in zip(trees, offsets)]),
+        ]).astype(np.int32),
+        'value': value,
+        'roots': offsets[:-1].astype(np.int32),
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'classes': model.classes_,
+    }
+
+def save_packed_forest(forest, path):
+    """Write each packed array to its own .npy file under the directory `path`"""
+    os.makedirs(path, exist_ok=True)
+    for name, array in forest.items():
+        np.save(os.path.join(path, f'{name}.npy'), np.asarray(array))
+
+def load_packed_forest(path):
+    """Memory-map a forest written by save_packed_forest
+
+    Arrays stay backed by the files (read-only), so processes loading the same model
+    share its pages and nothing is copied onto the heap.
+    """
+    # Plain ndarray views over the maps: np.memmap's subclass hooks slow down indexing
+    forest = {
+        name[:-len('.npy')]: np.load(os.path.join(path, name), mmap_mode='r').view(np.ndarray)
+        for name in os.listdir(path) if name.endswith('.npy')
+    }
+    forest['max_depth'] = int(forest['max_depth'])
+    return forest
+
+def quantize_features(X, forest):
+    """Map each value of X to its bin: the number of the feature's edges lying below it
+
+    Inputs are compared as float32 against the float64 edges, like sklearn does.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    edges, edge_offsets = forest['edges'], forest['edge_offsets']
+
+    if X.shape[0] <= QUANTIZE_COMPARE_ROWS:
+        # A few rows: one vectorized compare against every edge beats a per-feature loop.
+        # Negated <= so a missing (NaN) value lands above every edge, as searchsorted puts it
+        below = ~(X[:, forest['edge_feature']] <= edges)
+        counts = np.zeros((X.shape[0], below.shape[1] + 1), dtype=np.int32)
+        np.cumsum(below, axis=1, out=counts[:, 1:])
+        bins = counts[:, edge_offsets[1:]] - counts[:, edge_offsets[:-1]]
+        return bins.astype(forest['threshold_bin'].dtype)
+
+    bins = np.empty(X.shape, dtype=forest['threshold_bin'].dtype)
+    for j in range(X.shape[1]):
+        bins[:, j] = np.searchsorted(edges[edge_offsets[j]:edge_offsets[j + 1]], X[:, j], side='left')
+    return bins
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _walk_row_numba(x_bin, feature, threshold_bin, children, value, roots, out):
+        """Depth-first walk of every packed tree for one row, summing leaf values into out"""
+        for t in range(roots.shape[0]):
+            node = roots[t]
+            while children[node, 0] >= 0:
+                # Branchless child select: the comparison result is the column index
+                node = children[node, np.intp(x_bin[feature[node]] > threshold_bin[node])]
+            for k in range(value.shape[1]):
+                out[k] += value[node, k]
+
+    @njit(parallel=True, cache=True)
+    def _walk_forest_numba(X_bin, feature, threshold_bin, children, value, roots):
+        """Walk all rows, spread across cores"""
+        out = np.zeros((X_bin.shape[0], value.shape[1]))
+        for i in prange(X_bin.shape[0]):
+            _walk_row_numba(X_bin[i], feature, threshold_bin, children, value, roots, out[i])
+        return out / roots.shape[0]
+
+    @njit(cache=True)
+    def _walk_forest_numba_serial(X_bin, feature, threshold_bin, children, value, roots):
+        """Walk a few rows on the calling thread, skipping the parallel launch"""
+        out = np.zeros((X_bin.shape[0], value.shape[1]))
+        for i in range(X_bin.shape[0]):
+            _walk_row_numba(X_bin[i], feature, threshold_bin, children, value, roots, out[i])
+        return out / roots.shape[0]
+
+def predict_proba_packed(X, forest):
+    """Average leaf class distributions over all packed trees for each row of X
+
+    With numba installed the compiled walker is used. Otherwise every tree descends one
+    level per step for all rows at once; rows/trees that already sit on a leaf stay put.
+    """
+    X_bin = quantize_features(X, forest)
+    if NUMBA_AVAILABLE:
+        walk = _walk_forest_numba_serial if X_bin.shape[0] <= NUMBA_SERIAL_ROWS else _walk_forest_numba
+        return walk(
+            X_bin, forest['feature'], forest['threshold_bin'], forest['children'],
+            forest['value'], forest['roots']
+        )
+
+    feature, threshold_bin, children = forest['feature'], forest['threshold_bin'], forest['children']
+
+    nodes = np.repeat(forest['roots'][np.newaxis, :], X_bin.shape[0], axis=0)
+    rows = np.arange(X_bin.shape[0])[:, np.newaxis]
+    for _ in range(forest['max_depth']):
+        go_right = X_bin[rows, feature[nodes]] > threshold_bin[nodes]
+        next_nodes = children[nodes, go_right.view(np.int8)]
+        nodes = np.where(next_nodes < 0, nodes, next_nodes)
+
+    return forest['value'][nodes].mean(axis=1, dtype=np.float64)
+
+def permutation_importances(forest, X, y, n_repeats=10, random_state=42):
+    """Mean and std of the accuracy drop when each feature's column is shuffled
+
+    All n_repeats shuffles of one feature are stacked into a single array and scored with
+    one predict_proba_packed call, so the forest is walked once per feature rather than
+    once per (feature, repeat); memory stays at n_repeats copies of X.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    n_samples, n_features = X.shape
+    rng = np.random.RandomState(random_state)
+
+    def accuracies(X_stacked):
+        probability = predict_proba_packed(X_stacked, forest)
+        correct = forest['classes'][np.argmax(probability, axis=1)] == np.tile(y, len(X_stacked) // n_samples)
+        return correct.reshape(-1, n_samples).mean(axis=1)
+
+    baseline = accuracies(X)[0]
+    means, stds = np.empty(n_features), np.empty(n_features)
+    stacked = np.tile(X, (n_repeats, 1))
+    for j in range(n_features):
+        stacked[:, j] = np.concatenate([X[rng.permutation(n_samples), j] for _ in range(n_repeats)])
+        drops = baseline - accuracies(stacked)
+        means[j], stds[j] = drops.mean(), drops.std()
+        stacked[:, j] = np.tile(X[:, j], n_repeats)
+    return means, stds
+
 class AlzheimersPredictor:
-    def __init__(self):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
         self.model = None
         self.scaler = None
         self.feature_names = None
+        self._feature_name_set = frozenset()
+        self.forest = None
+        self.meta = None
+        self.fil = None
 
     def load_and_preprocess_data(self, file_path):
         """Load and preprocess the Alzheimer's disease dataset"""
-        print("Loading data...")
-        df = pd.read_csv(file_path)
-
-        # Remove PatientID and DoctorInCharge columns as they're not predictive features
-        df = df.drop(['PatientID', 'DoctorInCharge'], axis=1)
+        self._log("Loading data...")
+        # Skip PatientID and DoctorInCharge at parse time as they're not predictive features,
+        # and give every remaining column its dtype up front instead of having pandas infer it
+        with open(file_path, newline='') as f:
+            columns = [column for column in next(csv.reader(f)) if column not in NON_FEATURE_COLUMNS]
+        dtypes = dict.fromkeys(columns, np.float32)
+        dtypes['Diagnosis'] = np.int8
+        df = pd.read_csv(file_path, usecols=columns, dtype=dtypes, engine='c')
 
         # Separate features and target
         X = df.drop('Diagnosis', axis=1)
         y = df['Diagnosis']
 
-        print(f"Dataset shape: {df.shape}")
-        print(f"Features: {X.shape[1]}")
-        print(f"Diagnosis distribution:")
-        print(y.value_counts())
+        if self.verbose:
+            print(f"Dataset shape: {df.shape}")
+            print(f"Features: {X.shape[1]}")
+            print(f"Diagnosis distribution:")
+            print(y.value_counts())
 
         self.feature_names = X.columns.tolist()
+        self._feature_name_set = frozenset(self.feature_names)
         return X, y
 
-    def train_model(self, X, y, test_size=0.2, random_state=42):
-        """Train the Random Forest model"""
-        print("\nSplitting data...")
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
-        )
+    def train_model(self, X, y, test_size=0.2, random_state=42, n_jobs=-1,
+                    n_estimators=100, max_depth=6, tune=False, importance='impurity'):
+        """Train the Random Forest model (trees are built in parallel across n_jobs cores)
+
+        The default size is what select_forest_size picked on this dataset; pass tune=True
+        to rerun that sweep on the training split instead. importance='permutation' ranks
+        features by held-out permutation importance instead of impurity decrease.
+        """
+        self._log("\nSplitting data...")
+        train_idx, test_idx = self._split_indices(y, test_size, random_state)
+        if isinstance(X, pd.DataFrame):
+            X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+        else:
+            X_train, X_test = X[train_idx], X[test_idx]
+        y_values = np.asarray(y)
+        y_train, y_test = y_values[train_idx], y_values[test_idx]
 
-        # Scale the features
-        print("Scaling features...")
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # The forest works in float32 internally; casting once here avoids an upcast/copy
+        # per fit and halves the bytes streamed during split search
+        X_train = X_train.astype(np.float32, copy=False)
+        X_test = X_test.astype(np.float32, copy=False)
+
+        # No feature scaling: tree splits only compare a feature against a threshold,
+        # so standardizing first yields the same partitions at the cost of an extra pass
+        self.scaler = None
+
+        if tune:
+            self._log("Sweeping forest size...")
+            (n_estimators, max_depth), scores = select_forest_size(
+                X_train, y_train, random_state=random_state, n_jobs=n_jobs
+            )
+            if self.verbose:
+                for (n, d), score in scores.items():
+                    print(f"  n_estimators={n:<4} max_depth={d:<3} cv accuracy={score:.4f}")
+            self._log(f"Selected n_estimators={n_estimators}, max_depth={max_depth}")
 
         # Train Random Forest model
-        print("Training Random Forest model...")
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=random_state,
-            class_weight='balanced'
-        )
+        self._log("Training Random Forest model...")
+        self.model = build_forest(n_estimators, max_depth, random_state=random_state, n_jobs=n_jobs)
 
-        self.model.fit(X_train_scaled, y_train)
+        self.model.fit(X_train, y_train)
+        self.forest = pack_forest(self.model)
+        self._load_fil()
 
         # Make predictions
-        y_pred = self.model.predict(X_test_scaled)
+        y_pred = self.model.predict(X_test)
 
         # Evaluate model
         accuracy = accuracy_score(y_test, y_pred)
-        print(f"\nModel Accuracy: {accuracy:.4f}")
-        print("\nClassification Report:")
-        print(classification_report(y_test, y_pred))
+        if self.verbose:
+            print(f"\nModel Accuracy: {accuracy:.4f}")
+            print("\nClassification Report:")
+            print(classification_report(y_test, y_pred))
+
+        self.meta = {
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'test_accuracy': float(accuracy),
+        }
 
         # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': self.feature_names,
-            'importance': self.model.feature_importances_
-        }).sort_values('importance', ascending=False)
+        if importance == 'permutation':
+            self._log("\nComputing permutation importance...")
+            means, stds = permutation_importances(self.forest, X_test, y_test, random_state=random_state)
+            feature_importance = pd.DataFrame({
+                'feature': self.feature_names,
+                'importance': means,
+                'importance_std': stds
+            }).sort_values('importance', ascending=False)
+        else:
+            feature_importance = pd.DataFrame({
+                'feature': self.feature_names,
+                'importance': self.model.feature_importances_
+            }).sort_values('importance', ascending=False)
 
-        print("\nTop 10 Most Important Features:")
-        print(feature_importance.head(10))
+        if self.verbose:
+            print("\nTop 10 Most Important Features:")
+            print(feature_importance.head(10))
 
         return accuracy, feature_importance
 
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def _load_fil(self):
+        """Compile the sklearn model for GPU inference with FIL, when cuML is available"""
+        self.fil = None
+        if not CUML_AVAILABLE or self.model is None:
+            return
+        try:
+            self.fil = ForestInference.load_from_sklearn(self.model, output_class=True)
+        except Exception as e:
+            print(f"Warning: GPU inference unavailable, using CPU: {e}")
+
+    def _split_indices(self, y, test_size, random_state, cache_dir='.'):
+        """Stratified train/test indices, cached on disk per (labels, test_size, random_state)
+
+        The indices are exactly what train_test_split(..., stratify=y) returns, so cached
+        and fresh splits are identical; reruns just skip the stratified shuffle.
+        """
+        y_values = np.ascontiguousarray(y)
+        key = hashlib.blake2b(
+            y_values.tobytes() + f"{y_values.dtype}|{test_size}|{random_state}".encode('utf8')
+        ).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f".split_{key}.npz")
+
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                return cached['train'], cached['test']
+
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y_values)), test_size=test_size, random_state=random_state, stratify=y_values
+        )
+        np.savez(cache_path, train=train_idx, test=test_idx)
+        return train_idx, test_idx
+
     def predict_diagnosis(self, patient_data):
         """Predict diagnosis for a new patient"""
-        if self.model is None or self.scaler is None:
+        if self.forest is None:
             raise ValueError("Model not trained yet. Please train the model first.")
 
-        # Convert to DataFrame if it's a dictionary
+        # Ensure all required features are present
+        columns = patient_data if isinstance(patient_data, dict) else patient_data.columns
+        self._check_features(columns)
+
+        # Build the feature matrix in training column order; a single patient dict
+        # goes straight into an array instead of through a one-row DataFrame
         if isinstance(patient_data, dict):
-            patient_df = pd.DataFrame([patient_data])
+            features = np.fromiter(
+                (patient_data[name] for name in self.feature_names),
+                dtype=np.float64, count=len(self.feature_names)
+            ).reshape(1, -1)
         else:
-            patient_df = patient_data
+            features = patient_data[self.feature_names].to_numpy(dtype=np.float64)
 
-        # Ensure all required features are present
-        missing_features = set(self.feature_names) - set(patient_df.columns)
-        if missing_features:
-            raise ValueError(f"Missing features: {missing_features}")
+        return self._diagnose(features)[0]
 
-        # Reorder columns to match training data
-        patient_df = patient_df[self.feature_names]
+    def predict_diagnoses(self, patients):
+        """Predict diagnoses for a list of patient dicts with a single pass over the forest"""
+        if self.forest is None:
+            raise ValueError("Model not trained yet. Please train the model first.")
 
-        # Scale the features
-        patient_scaled = self.scaler.transform(patient_df)
+        for patient_data in patients:
+            self._check_features(patient_data)
 
-        # Make prediction
-        prediction = self.model.predict(patient_scaled)
-        probability = self.model.predict_proba(patient_scaled)
+        features = np.array(
+            [[patient_data[name] for name in self.feature_names] for patient_data in patients],
+            dtype=np.float64
+        ).reshape(len(patients), len(self.feature_names))
 
-        return {
-            'diagnosis': int(prediction[0]),
-            'diagnosis_label': 'Alzheimer\'s Disease' if prediction[0] == 1 else 'No Alzheimer\'s Disease',
-            'probability_no_alzheimers': float(probability[0][0]),
-            'probability_alzheimers': float(probability[0][1])
-        }
+        return self._diagnose(features)
 
-    def save_model(self, model_path='alzheimers_model.joblib', scaler_path='alzheimers_scaler.joblib'):
-        """Save the trained model and scaler"""
-        if self.model is not None and self.scaler is not None:
+    def _check_features(self, columns):
+        missing_features = self._feature_name_set.difference(columns)
+        if missing_features:
+            raise ValueError(f"Missing features: {set(missing_features)}")
+
+    def _diagnose(self, features):
+        """Turn a feature matrix in training column order into one result dict per row"""
+        # Models trained before scaling was dropped still expect standardized input
+        # (same arithmetic as StandardScaler.transform)
+        if self.scaler is not None:
+            features = (features - self.scaler.mean_) / self.scaler.scale_
+
+        # Make prediction: one pass over the packed forest for the probabilities, then
+        # pick the class the same way RandomForestClassifier.predict does (argmax)
+        if self.fil is not None and len(features) >= FIL_MIN_BATCH:
+            probability = cupy.asnumpy(self.fil.predict_proba(cupy.asarray(features, dtype=cupy.float32)))
+        else:
+            probability = predict_proba_packed(features, self.forest)
+        prediction = self.forest['classes'][np.argmax(probability, axis=1)]
+
+        return [
+            {
+                'diagnosis': int(label),
+                'diagnosis_label': 'Alzheimer\'s Disease' if label == 1 else 'No Alzheimer\'s Disease',
+                'probability_no_alzheimers': float(proba[0]),
+                'probability_alzheimers': float(proba[1])
+            }
+            for label, proba in zip(prediction, probability)
+        ]
+
+    def save_model(self, model_path='alzheimers_model.joblib', scaler_path='alzheimers_scaler.joblib', packed_path='alzheimers_packed', meta_path='model_meta.json'):
+        """Save the trained model, its packed forest and metadata (and the scaler, for models that still use one)"""
+        if self.model is not None:
             joblib.dump(self.model, model_path)
-            joblib.dump(self.scaler, scaler_path)
             joblib.dump(self.feature_names, 'feature_names.joblib')
-            print(f"Model saved to {model_path}")
-            print(f"Scaler saved to {scaler_path}")
-
-    def load_model(self, model_path='alzheimers_model.joblib', scaler_path='alzheimers_scaler.joblib', feature_names_path='feature_names.joblib'):
-        """Load a pre-trained model and scaler"""
-        self.model = joblib.load(model_path)
-        self.scaler = joblib.load(scaler_path)
+            save_packed_forest(self.forest, packed_path)
+            self._log(f"Model saved to {model_path}")
+            self._log(f"Packed forest saved to {packed_path}")
+            if self.meta is not None:
+                with open(meta_path, 'w') as f:
+                    json.dump(self.meta, f, indent=2)
+                self._log(f"Model metadata saved to {meta_path}")
+            if self.scaler is not None:
+                joblib.dump(self.scaler, scaler_path)
+                self._log(f"Scaler saved to {scaler_path}")
+
+    def load_model(self, model_path='alzheimers_model.joblib', scaler_path='alzheimers_scaler.joblib', feature_names_path='feature_names.joblib', packed_path='alzheimers_packed'):
+        """Load a pre-trained model (and its scaler, if it was trained with one)
+
+        Prediction only needs the packed forest, so when it has been saved the arrays are
+        memory-mapped and the pickled RandomForestClassifier is not loaded at all.
+        """
+        if os.path.isdir(packed_path):
+            # FIL is built from the sklearn model, so GPU deployments still load it
+            self.model = joblib.load(model_path) if CUML_AVAILABLE else None
+            self.forest = load_packed_forest(packed_path)
+        else:
+            self.model = joblib.load(model_path)
+            self.forest = pack_forest(self.model)
+        self._load_fil()
+        self.scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
         self.feature_names = joblib.load(feature_names_path)
-        print("Model and scaler loaded successfully")
+        self._feature_name_set = frozenset(self.feature_names)
+        self._log("Model and scaler loaded successfully" if self.scaler is not None else "Model loaded successfully")
 
 def main():
     # Initialize predictor
-    predictor = AlzheimersPredictor()
+    predictor = AlzheimersPredictor(verbose=True)
 
     # Load and preprocess data
     X, y = predictor.load_and_preprocess_data('alzheimers_disease_data.csv')
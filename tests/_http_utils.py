@@ -0,0 +1,194 @@
+"""
+HTTP helpers shared by the live-server test scripts
+"""
+
+import hashlib
+import json
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BASE_URL = "http://localhost:8000"
+
+# Sent as X-Session-Id on every request so the server can tie one run's calls together
+RUN_ID = str(uuid.uuid4())
+
+# Socket options for the httpx transports: small JSON POSTs are sent immediately
+# (no Nagle / delayed-ACK stall) and idle pooled connections are kept alive
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# 5xx statuses worth retrying on the httpx clients, with exponential backoff between attempts.
+# Only idempotent methods are retried: a POST may already have changed state, and the API's
+# own 503 ("predictor not available") should reach the caller unchanged.
+RETRY_STATUSES = {502, 503, 504}
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 0.2
+
+class RetryTransport(httpx.HTTPTransport):
+    """HTTP transport that also retries transient 5xx responses to idempotent requests (connect errors are retried by httpx)"""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in RETRY_METHODS:
+            return super().handle_request(request)
+        for attempt in range(RETRY_ATTEMPTS):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS - 1:
+                return response
+            response.close()
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+def make_client() -> httpx.Client:
+    """Keep-alive httpx client for BASE_URL (HTTP/2 when h2 is installed)"""
+    return httpx.Client(
+        base_url=BASE_URL,
+        headers={"X-Session-Id": RUN_ID},
+        timeout=30,
+        transport=RetryTransport(
+            retries=RETRY_ATTEMPTS,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=30),
+            socket_options=SOCKET_OPTIONS,
+        ),
+    )
+
+# One keep-alive session for the health check and analysis calls, shared by every script
+DEFAULT_HEADERS = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.headers.update(DEFAULT_HEADERS)
+SESSION.headers["X-Session-Id"] = RUN_ID
+
+# COGNIFY_HTTPX=1 sends the analysis call through an httpx client instead of the requests session
+USE_HTTPX = os.getenv("COGNIFY_HTTPX") == "1"
+HTTPX_CLIENT = httpx.Client(http2=HTTP2_AVAILABLE, headers=DEFAULT_HEADERS) if USE_HTTPX else None
+
+def post_body(endpoint: str, body: bytes, timeout: float = 30):
+    """POST a pre-encoded JSON body through the configured HTTP client"""
+    if USE_HTTPX:
+        return HTTPX_CLIENT.post(endpoint, content=body, timeout=timeout)
+    return SESSION.post(endpoint, data=body, timeout=timeout)
+
+# Opt-in on-disk cache of successful analysis responses, keyed by endpoint + request body.
+# Off by default so every run reaches the server; --cache (or COGNIFY_CACHE=1) turns it on
+# and --cache-dir DIR turns it on at DIR.
+DEFAULT_CACHE_DIR = Path(".pytest_cache/analysis")
+CACHE_DIR = DEFAULT_CACHE_DIR if os.getenv("COGNIFY_CACHE") == "1" else None
+CACHE_TTL_SECONDS = 24 * 3600
+
+def configure_cache(argv) -> None:
+    """Apply the --cache / --cache-dir command line options"""
+    global CACHE_DIR
+    if "--cache-dir" in argv[:-1]:
+        CACHE_DIR = Path(argv[argv.index("--cache-dir") + 1])
+    elif "--cache" in argv:
+        CACHE_DIR = DEFAULT_CACHE_DIR
+
+def post_cached(endpoint: str, body: bytes, timeout: float = 30) -> requests.Response:
+    """POST body, reusing a cached 200 response younger than CACHE_TTL_SECONDS"""
+    if CACHE_DIR is None:
+        return post_body(endpoint, body, timeout)
+    
+    key = hashlib.blake2b(endpoint.encode() + b"\0" + body, digest_size=16).hexdigest()
+    path = CACHE_DIR / f"{key}.json"
+    if path.exists() and time.time() - path.stat().st_mtime < CACHE_TTL_SECONDS:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = endpoint
+        response.headers["X-Cache"] = "HIT"
+        response._content = path.read_bytes()
+        return response
+    
+    response = post_body(endpoint, body, timeout)
+    if response.status_code == 200:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(response.content)
+    return response
+
+def transfer_summary(response: requests.Response) -> str:
+    """Bytes on the wire vs decoded body size (shows the gzip ratio when the server compressed)"""
+    decoded = len(response.content)
+    if response.headers.get("X-Cache") == "HIT":
+        return f"{decoded} bytes from cache ({CACHE_DIR})"
+    wire = response.headers.get("Content-Length")
+    if response.headers.get("Content-Encoding") == "gzip" and wire:
+        return f"{int(wire)} bytes gzip -> {decoded} bytes ({decoded / int(wire):.1f}x)"
+    return f"{decoded} bytes uncompressed"
+
+def loads_json(content: bytes):
+    """Parse a JSON response body (orjson when available)"""
+    return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+
+def dumps_json(data) -> bytes:
+    """Encode a request body (orjson when available)"""
+    return orjson.dumps(data) if ORJSON_AVAILABLE else json.dumps(data).encode()
+
+def save_json(path: str, data, pretty: bool = True) -> None:
+    """Write data to path as JSON, indented unless pretty is False (orjson when available)
+
+    orjson serializes datetimes (naive ones as UTC) and numpy values natively;
+    the stdlib fallback stringifies anything it cannot encode.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2 if pretty else None,
+                      separators=None if pretty else (',', ':'), default=str)
+
+# A successful health check is remembered for this long; failures are always re-checked
+HEALTH_TTL_SECONDS = 30
+_health_ok_at = None
+
+def api_health(session: requests.Session = SESSION) -> bool:
+    """Check that the API is running and print its health report"""
+
+    global _health_ok_at
+    if _health_ok_at is not None and time.monotonic() - _health_ok_at < HEALTH_TTL_SECONDS:
+        return True
+
+    try:
+        response = session.get(f"{BASE_URL}/", timeout=5)
+        if response.status_code == 200:
+            health = response.json()
+            print("API Health Check:")
+            print(f"  Service: {health.get('service', 'Unknown')}")
+            print(f"  Alzheimer's Predictor: {health.get('alzheimers_predictor', 'Unknown')}")
+            print(f"  LLM Configured: {health.get('llm_configured', 'Unknown')}")
+            _health_ok_at = time.monotonic()
+            return True
+        else:
+            print(f"✗ API Health Check Failed: {response.status_code}")
+            return False
+
+    except requests.exceptions.ConnectionError:
+        print("✗ API not running. Start with: uvicorn app:app --reload")
+        return False
+    except Exception as e:
+        print(f"✗ Health check error: {e}")
+        return False
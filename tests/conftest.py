@@ -0,0 +1,37 @@
+"""
+pytest configuration for the live-server test scripts
+
+The scripts are independent of each other (different endpoints, different output
+files), so when pytest-xdist is installed they are spread over worker processes
+by default, one file per worker. Pass -n explicitly (e.g. -n 0) to override;
+PYTEST_WORKERS sets the default worker count.
+
+Scripts written as pytest tests get a shared httpx client through the client fixture.
+"""
+
+import os
+import pytest
+
+from _http_utils import make_client
+
+try:
+    import xdist  # noqa: F401
+    XDIST_AVAILABLE = True
+except ImportError:
+    XDIST_AVAILABLE = False
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    # Runs before xdist's own hook, which turns numprocesses into worker specs
+    if not XDIST_AVAILABLE or os.getenv("PYTEST_XDIST_WORKER"):
+        return
+    if config.getoption("numprocesses", None) is None:
+        config.option.numprocesses = int(os.getenv("PYTEST_WORKERS", "2"))
+        if config.option.dist == "no":
+            config.option.dist = "loadfile"
+
+@pytest.fixture(scope="session")
+def client():
+    """One keep-alive httpx client per test process"""
+    with make_client() as c:
+        yield c
@@ -3,16 +3,19 @@
 Minimal FastAPI app to test the app folder endpoints
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from app.analysis import router as analysis_router, configure_llm
 from app.analysis.conversation_analyzer import router as conversation_router
 from app.patient.intake import router as intake_router
-from app.patient.regular_chat import router as chat_router
+from app.patient.regular_chat import router as chat_router, initialize_chatbot, InitializeChatbotRequest
 from app.doctor.review import router as doctor_router
+from app.analysis.diagnosis_treatment_planning import diagnosis_planner
 
 # Create FastAPI app
 app = FastAPI(title="CognifyCare Test App")
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # Include routers
 app.include_router(analysis_router)
@@ -21,6 +24,14 @@ app.include_router(doctor_router)
 app.include_router(intake_router)
 app.include_router(chat_router)
 
+def warm_predictor():
+    """Run one throwaway prediction at startup so the first request doesn't pay first-call costs"""
+    if diagnosis_planner.is_predictor_available():
+        predictor = diagnosis_planner.predictor
+        predictor.predict_diagnosis(dict.fromkeys(predictor.feature_names, 0))
+
+app.router.add_event_handler("startup", warm_predictor)
+
 # LLM Configuration endpoint
 class LLMConfigRequest(BaseModel):
     api_key: str
@@ -60,8 +71,6 @@ class IntakeAnalysisResponse(BaseModel):
 @app.post("/api/patient/{patient_id}/intake/analyze", response_model=IntakeAnalysisResponse)
 def analyze_intake_with_alzheimers_prediction(patient_id: int, req: IntakeAnalysisRequest):
     """Analyze patient intake data with Alzheimer's prediction"""
-    from app.analysis.diagnosis_treatment_planning import diagnosis_planner
-    
     if not diagnosis_planner.is_predictor_available():
         raise HTTPException(
             status_code=503, 
@@ -89,6 +98,32 @@ def analyze_intake_with_alzheimers_prediction(patient_id: int, req: IntakeAnalys
             detail=f"Error in intake analysis: {str(e)}"
         )
 
+class AnalyzeAndInitRequest(BaseModel):
+    intake_data: dict
+
+class AnalyzeAndInitResponse(IntakeAnalysisResponse):
+    chatbot_id: str
+
+@app.post("/api/patient/{patient_id}/intake/analyze_and_init", response_model=AnalyzeAndInitResponse)
+def analyze_intake_and_initialize_chatbot(patient_id: int, req: AnalyzeAndInitRequest):
+    """Analyze intake data and initialize the patient's chatbot from the result in one call"""
+    analysis = analyze_intake_with_alzheimers_prediction(
+        patient_id, IntakeAnalysisRequest(patient_id=patient_id, intake_data=req.intake_data)
+    )
+    init_result = initialize_chatbot(
+        patient_id,
+        InitializeChatbotRequest(
+            patient_id=patient_id,
+            patient_portfolio=analysis.patient_portfolio,
+            treatment_plan=analysis.treatment_plan,
+            chatbot_config=analysis.companion_chatbot_config
+        ),
+        # Throwaway response: the chatbot config's ETag doesn't describe this combined body
+        Response(),
+        if_none_match=None
+    )
+    return AnalyzeAndInitResponse(**analysis.model_dump(), chatbot_id=init_result.chatbot_id)
+
 # Root endpoint
 @app.get("/")
 def root():
@@ -105,5 +140,13 @@ def root():
     }
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker imports this module and loads the predictor itself; the packed forest is
+    # memory-mapped read-only from ml/alzheimers_packed, so workers share its pages
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        module = os.path.splitext(os.path.basename(__file__))[0]
+        uvicorn.run(f"{module}:app", host="0.0.0.0", port=8000, workers=workers, loop="auto", http="auto")
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
@@ -6,188 +6,531 @@ Tests two main workflows:
 2. Routine Chat Flow - Daily check-in chatbot interaction
 """
 
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+import logging.handlers
+import mmap
+import os
+import shelve
+import shutil
+import sys
+import tarfile
+import time
+import httpx
 import requests
-import json
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 BASE_URL = "http://localhost:8000"
 
+# Connect/read timeouts for every synchronous call
+TIMEOUT = (3, 30)
+
+# One pooled session for all synchronous calls so connections are kept alive and reused
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=Retry(total=3, backoff_factor=0.2))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Chatbot ETags (always revalidated by the server) and, with WORKFLOW_CACHE=1, responses of
+# /intake/analyze keyed by a hash of the request. The analysis cache is off by default so
+# Workflow 2 always reaches the analyzer; cached responses expire after WORKFLOW_CACHE_TTL seconds.
+ANALYSIS_CACHE_DIR = Path(os.getenv("WORKFLOW_CACHE_DIR", ".workflow_cache"))
+USE_ANALYSIS_CACHE = os.getenv("WORKFLOW_CACHE") == "1"
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("WORKFLOW_CACHE_TTL", str(24 * 3600)))
+
+# Skip the intake Q&A in Workflow 1 and analyze SAMPLE_INTAKE_DATA directly (benchmarking the analyzer)
+SKIP_INTAKE_LOOP = bool(os.getenv("SKIP_INTAKE_LOOP"))
+
+# When set, the result files are bundled into this one tar archive (zstd-compressed
+# when zstandard is installed, gzip otherwise) instead of being written separately
+RESULTS_ARCHIVE = os.getenv("WORKFLOW_ARCHIVE")
+_archive_members: Dict[str, bytes] = {}
+
+# Cap on intake/chat sessions driven at once by run_intake_sessions / run_chat_sessions
+MAX_CONCURRENT_SESSIONS = 20
+
+# Simulated patient answers to all intake questions
+INTAKE_ANSWERS = [
+    "72",  # Age
+    "female",  # Gender
+    "white",  # Ethnicity
+    "college",  # Education
+    "165 cm",  # Height
+    "70 kg",  # Weight
+    "skip",  # BMI (will be calculated)
+    "no",  # Smoking
+    "2",  # Alcohol per week
+    "5",  # Physical activity
+    "2",  # Diet quality
+    "6",  # Sleep quality
+    "yes",  # Family history Alzheimers
+    "no",  # Cardiovascular disease
+    "yes",  # Diabetes
+    "yes",  # Depression
+    "no",  # Head injury
+    "yes",  # Hypertension
+    "142",  # Systolic BP
+    "88",  # Diastolic BP
+    "215",  # Total cholesterol
+    "135",  # LDL
+    "48",  # HDL
+    "160",  # Triglycerides
+    "21",  # MMSE score
+    "72",  # Functional assessment
+    "78",  # ADL
+    "yes",  # Memory complaints
+    "no",  # Behavioral problems
+    "yes",  # Confusion
+    "yes",  # Disorientation
+    "no",  # Personality changes
+    "yes",  # Difficulty completing tasks
+    "yes"  # Forgetfulness
+]
+
+# Simulated patient messages for the routine check-in conversation
+CHAT_MESSAGES = [
+    "I'm feeling a bit confused today",
+    "I didn't sleep well last night, maybe 4 hours",
+    "Yes, I took my morning medications",
+    "My energy is very low, about a 3 out of 10",
+    "I forgot to eat breakfast again",
+    "I'm having trouble remembering what day it is"
+]
+
+# Patient driven through both workflows. --parallel gives Workflow 2 its own patient so the
+# concurrent workflows never share intake sessions, analysis results or chatbot state
+PATIENT_ID = 54321
+PARALLEL_CHAT_PATIENT_ID = 54322
+
+# --sessions N: patient IDs for the concurrent intake sessions start here
+SESSION_PATIENT_ID_START = 60000
+
+# Workflow output goes through a buffered logger; WORKFLOW_LOG=WARNING keeps only errors
+log = logging.getLogger("workflow")
+log.setLevel(os.getenv("WORKFLOW_LOG", "INFO"))
+log.propagate = False
+
+class _StdoutHandler(logging.StreamHandler):
+    """StreamHandler bound to whatever sys.stdout is when it emits (pytest swaps it per test)"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+_stream_handler = _StdoutHandler()
+_stream_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_buffer = logging.handlers.MemoryHandler(capacity=256, target=_stream_handler)
+log.addHandler(_log_buffer)
+
+# Feature record matching INTAKE_ANSWERS, used when Workflow 2 runs on its own
+FEATURE_NAMES = (
+    "Age", "Gender", "Ethnicity", "EducationLevel",
+    "BMI", "Smoking", "AlcoholConsumption",
+    "PhysicalActivity", "DietQuality", "SleepQuality",
+    "FamilyHistoryAlzheimers", "CardiovascularDisease",
+    "Diabetes", "Depression", "HeadInjury",
+    "Hypertension", "SystolicBP", "DiastolicBP",
+    "CholesterolTotal", "CholesterolLDL",
+    "CholesterolHDL", "CholesterolTriglycerides",
+    "MMSE", "FunctionalAssessment", "ADL",
+    "MemoryComplaints", "BehavioralProblems",
+    "Confusion", "Disorientation", "PersonalityChanges",
+    "DifficultyCompletingTasks", "Forgetfulness"
+)
+SAMPLE_VALUES = (
+    72, 0, 0, 2,
+    25.7, 0, 2,
+    5, 2, 6,
+    1, 0,
+    1, 1, 0,
+    1, 142, 88,
+    215, 135,
+    48, 160,
+    21, 72, 78,
+    1, 0,
+    1, 1, 0,
+    1, 1
+)
+SAMPLE_INTAKE_DATA = dict(zip(FEATURE_NAMES, SAMPLE_VALUES))
+
+def flushes_log(func):
+    """Flush the buffered workflow output when func returns, on every exit path"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _log_buffer.flush()
+    return wrapper
+
+def log_step(title: str):
+    """Flush buffered output, then log a step header"""
+    _log_buffer.flush()
+    log.info("\n%s", title)
+
 def print_json(data: Dict[str, Any], title: str = ""):
     """Pretty print JSON data"""
+    if not log.isEnabledFor(logging.INFO):
+        return
     if title:
-        print(f"\n{'='*70}")
-        print(f"  {title}")
-        print('='*70)
-    print(json.dumps(data, indent=2))
-    print()
+        log.info("\n%s", '='*70)
+        log.info("  %s", title)
+        log.info("%s", '='*70)
+    log.info("%s", orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+    log.info("")
+
+def save_json(path: str, data: Any):
+    """Write data to path as indented JSON (or queue it for the results archive)"""
+    buf = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    if RESULTS_ARCHIVE:
+        _archive_members[path] = buf
+    else:
+        Path(path).write_bytes(buf)
+
+def write_results_archive():
+    """Write every queued result file into RESULTS_ARCHIVE in one pass"""
+    with open(RESULTS_ARCHIVE, "wb") as raw:
+        if ZSTD_AVAILABLE:
+            with zstandard.ZstdCompressor(level=3).stream_writer(raw) as out, tarfile.open(fileobj=out, mode="w|") as tar:
+                _add_archive_members(tar)
+        else:
+            with tarfile.open(fileobj=raw, mode="w|gz") as tar:
+                _add_archive_members(tar)
+
+def _add_archive_members(tar: tarfile.TarFile):
+    now = int(time.time())
+    for name, buf in _archive_members.items():
+        info = tarfile.TarInfo(name)
+        info.size = len(buf)
+        info.mtime = now
+        tar.addfile(info, io.BytesIO(buf))
 
 def print_section(title: str):
     """Print section header"""
-    print(f"\n{'#'*70}")
-    print(f"# {title}")
-    print(f"{'#'*70}\n")
-
-# ============================================================================
-# WORKFLOW 1: INTAKE ANALYSIS FLOW
-# ============================================================================
-
-def test_intake_analysis_flow():
+    log.info("\n%s", '#'*70)
+    log.info("# %s", title)
+    log.info("%s\n", '#'*70)
+
+def make_async_client() -> httpx.AsyncClient:
+    """Pooled async client for the test server (HTTP/2 when h2 is installed)"""
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
+async def post_answers(client: httpx.AsyncClient, patient_id: int, session_id: str,
+                       answers: List[str]) -> List[Dict[str, Any]]:
+    """Send intake answers in order and return the replies, up to the one that finishes
+
+    Answers within a session stay sequential because each reply depends on the
+    session state left by the previous one.
     """
-    Test Workflow 1: Intake Analysis Flow
+    url = f"/api/patient/{patient_id}/intake/reply"
+    bodies = [orjson.dumps({"session_id": session_id, "message": answer}) for answer in answers]
+    replies = []
+    for body in bodies:
+        response = await client.post(url, content=body, headers=JSON_HEADERS)
+        response.raise_for_status()
+        replies.append(orjson.loads(response.content))
+        if replies[-1].get("finished"):
+            break
+    return replies
 
-    Steps:
-    1. Start intake session
-    2. Answer all intake questions
-    3. Complete intake and get analysis
-    4. Verify Alzheimer's prediction, diagnosis, and treatment plan
+async def post_chat_turns(client: httpx.AsyncClient, session_id: str, messages: List[str]) -> List[Dict[str, Any]]:
+    """Send chat messages in order and return the replies, up to the one that completes the conversation
+
+    Turns within a session stay sequential because each reply advances the
+    session's activity state.
     """
+    bodies = [orjson.dumps({"session_id": session_id, "patient_message": message}) for message in messages]
+    replies = []
+    for body in bodies:
+        response = await client.post("/api/patient/chat/message", content=body, headers=JSON_HEADERS)
+        response.raise_for_status()
+        replies.append(orjson.loads(response.content))
+        if replies[-1].get("conversation_complete"):
+            break
+    return replies
+
+async def run_chat_sessions(patient_id: int, messages: List[str], n_sessions: int,
+                            chat_type: str = "daily_check_in") -> List[List[Dict[str, Any]]]:
+    """Drive several chat sessions for an initialized patient concurrently (for benchmarking)"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+    start_body = orjson.dumps({"patient_id": patient_id, "chat_type": chat_type})
+
+    async def run_session(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        async with semaphore:
+            response = await client.post(f"/api/patient/{patient_id}/chat/start", content=start_body, headers=JSON_HEADERS)
+            response.raise_for_status()
+            return await post_chat_turns(client, orjson.loads(response.content)["session_id"], messages)
+
+    async with make_async_client() as client:
+        return await asyncio.gather(*(run_session(client) for _ in range(n_sessions)))
+
+def log_error_body(e: Exception):
+    """Log the response body attached to a failed request, if any"""
+    response = getattr(e, "response", None)
+    if response is not None:
+        log.info("Response: %s", response.text)
+
+def post_json(url: str, payload: Any, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
+    """POST payload encoded with orjson on the pooled session"""
+    return SESSION.post(url, data=orjson.dumps(payload), headers={**JSON_HEADERS, **(headers or {})},
+                        timeout=TIMEOUT, stream=stream)
+
+def stream_json_to_file(response: requests.Response, path: str) -> Any:
+    """Copy a streamed JSON response body to path, then parse it from the mapped file"""
+    if RESULTS_ARCHIVE:
+        _archive_members[path] = response.content
+        return orjson.loads(_archive_members[path])
+    response.raw.decode_content = True
+    with open(path, "wb") as f:
+        shutil.copyfileobj(response.raw, f, 1 << 16)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+        return orjson.loads(view)
+
+def submit_intake_batch(patient_id: int, session_id: str, answers: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """Send all intake answers in one request; returns None if the server has no batch endpoint"""
+    response = post_json(
+        f"{BASE_URL}/api/patient/{patient_id}/intake/reply_batch",
+        {"session_id": session_id, "messages": answers}
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def run_intake_sessions(patient_ids: List[int], answers: List[str] = INTAKE_ANSWERS) -> List[List[Dict[str, Any]]]:
+    """Drive full intake sessions for several patients concurrently (for benchmarking)"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+
+    async def run_session(client: httpx.AsyncClient, patient_id: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            response = await client.post(f"/api/patient/{patient_id}/intake/start")
+            response.raise_for_status()
+            return await post_answers(client, patient_id, orjson.loads(response.content)["session_id"], answers)
+
+    async with make_async_client() as client:
+        return await asyncio.gather(*(run_session(client, patient_id) for patient_id in patient_ids))
+
+@functools.lru_cache(maxsize=128)
+def _analyze_cached(patient_id: int, intake_items: tuple) -> bytes:
+    intake = dict(intake_items)
+    key = hashlib.blake2b(orjson.dumps([patient_id, intake], option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    path = ANALYSIS_CACHE_DIR / f"{key}.json"
+    if USE_ANALYSIS_CACHE and path.exists() and time.time() - path.stat().st_mtime < ANALYSIS_CACHE_TTL_SECONDS:
+        return path.read_bytes()
+    response = post_json(
+        f"{BASE_URL}/api/patient/{patient_id}/intake/analyze",
+        {"patient_id": patient_id, "intake_data": intake}
+    )
+    response.raise_for_status()
+    if USE_ANALYSIS_CACHE:
+        ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(response.content)
+    return response.content
+
+def analyze_intake(patient_id: int, intake: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze an intake record, reusing the response for identical input within this run
+    (and from disk with WORKFLOW_CACHE=1)"""
+    return orjson.loads(_analyze_cached(patient_id, tuple(sorted(intake.items()))))
+
+def initialize_chatbot(patient_id: int, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Initialize the patient's chatbot, skipping re-initialization when the server
+    still holds one built from the same portfolio, plan and config (ETag / 304)"""
+    payload = {
+        "patient_id": patient_id,
+        "patient_portfolio": analysis_result["patient_portfolio"],
+        "treatment_plan": analysis_result["treatment_plan"],
+        "chatbot_config": analysis_result["companion_chatbot_config"]
+    }
+    cfg_hash = hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    key = f"{patient_id}:{cfg_hash}"
+
+    ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with shelve.open(str(ANALYSIS_CACHE_DIR / "chatbots")) as cache:
+        cached = cache.get(key)
+        headers = {"If-None-Match": cached["etag"]} if cached else None
+        response = post_json(f"{BASE_URL}/api/patient/{patient_id}/chatbot/initialize", payload, headers)
+        if response.status_code == 304:
+            return {"chatbot_id": response.headers.get("X-Chatbot-Id", cached["chatbot_id"]), "status": "active"}
+        response.raise_for_status()
+        init_result = orjson.loads(response.content)
+        if response.headers.get("ETag"):
+            cache[key] = {"etag": response.headers["ETag"], "chatbot_id": init_result["chatbot_id"]}
+        return init_result
+
+_analysis_sections = itemgetter("alzheimers_prediction", "diagnosis_analysis", "analysis_method")
+_diagnosis_fields = itemgetter("risk_level", "predicted_diagnosis")
+
+def analysis_highlights(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """The headline fields of an /intake/analyze result"""
+    prediction, diagnosis, method = _analysis_sections(analysis_result)
+    risk_level, predicted_diagnosis = _diagnosis_fields(diagnosis)
+    return {
+        "alzheimers_diagnosis": prediction["diagnosis_label"],
+        "alzheimers_probability": "%.2f%%" % (prediction["probability_alzheimers"] * 100),
+        "risk_level": risk_level,
+        "predicted_diagnosis": predicted_diagnosis,
+        "analysis_method": method
+    }
 
-    print_section("WORKFLOW 1: INTAKE ANALYSIS FLOW")
+# ============================================================================
+# WORKFLOW 1: INTAKE ANALYSIS FLOW
+# ============================================================================
 
-    patient_id = 54321
+def run_intake_steps(patient_id: int) -> Optional[Dict[str, Any]]:
+    """Steps 1-3 of Workflow 1: drive the intake Q&A and return the collected data (None on failure)"""
 
     # Step 1: Start intake session
-    print("\n📝 Step 1: Starting intake session...")
+    log_step("📝 Step 1: Starting intake session...")
     try:
-        response = requests.post(f"{BASE_URL}/api/patient/{patient_id}/intake/start")
+        response = SESSION.post(f"{BASE_URL}/api/patient/{patient_id}/intake/start", timeout=TIMEOUT)
         response.raise_for_status()
-        start_result = response.json()
+        start_result = orjson.loads(response.content)
 
         session_id = start_result["session_id"]
-        print(f"✓ Session created: {session_id}")
-        print(f"First question: {start_result['prompt']}")
+        log.info("✓ Session created: %s", session_id)
+        log.info("First question: %s", start_result['prompt'])
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error starting intake: {e}")
-        return False
+        log.error("❌ Error starting intake: %s", e)
+        return None
 
     # Step 2: Answer all intake questions
-    print("\n📝 Step 2: Answering intake questions...")
-
-    # Simulate patient answers to all questions
-    answers = [
-        "72",  # Age
-        "female",  # Gender
-        "white",  # Ethnicity
-        "college",  # Education
-        "165 cm",  # Height
-        "70 kg",  # Weight
-        "skip",  # BMI (will be calculated)
-        "no",  # Smoking
-        "2",  # Alcohol per week
-        "5",  # Physical activity
-        "2",  # Diet quality
-        "6",  # Sleep quality
-        "yes",  # Family history Alzheimers
-        "no",  # Cardiovascular disease
-        "yes",  # Diabetes
-        "yes",  # Depression
-        "no",  # Head injury
-        "yes",  # Hypertension
-        "142",  # Systolic BP
-        "88",  # Diastolic BP
-        "215",  # Total cholesterol
-        "135",  # LDL
-        "48",  # HDL
-        "160",  # Triglycerides
-        "21",  # MMSE score
-        "72",  # Functional assessment
-        "78",  # ADL
-        "yes",  # Memory complaints
-        "no",  # Behavioral problems
-        "yes",  # Confusion
-        "yes",  # Disorientation
-        "no",  # Personality changes
-        "yes",  # Difficulty completing tasks
-        "yes"  # Forgetfulness
-    ]
-
-    for i, answer in enumerate(answers, 1):
-        try:
-            response = requests.post(
-                f"{BASE_URL}/api/patient/{patient_id}/intake/reply",
-                json={
-                    "session_id": session_id,
-                    "message": answer
-                }
+    log_step("📝 Step 2: Answering intake questions...")
+
+    async def answer_all():
+        async with make_async_client() as client:
+            return await post_answers(client, patient_id, session_id, INTAKE_ANSWERS)
+
+    try:
+        replies = submit_intake_batch(patient_id, session_id, INTAKE_ANSWERS)
+        if replies is None:
+            # Server without the batch endpoint: fall back to one request per answer
+            replies = asyncio.run(answer_all())
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        log.error("❌ Error answering intake questions: %s", e)
+        return None
+
+    intake_data = None
+    for i, (answer, reply_result) in enumerate(zip(INTAKE_ANSWERS, replies), 1):
+        if reply_result.get("finished"):
+            log.info("✓ Intake completed after %s questions", i)
+            summary = reply_result.get("summary") or {}
+            intake_data = summary.get("answers")
+            print_json(summary, "Intake Summary")
+        else:
+            log.info("  Q%s: %s → Next: %s...", i, answer, reply_result.get('next_prompt', 'N/A')[:60])
+
+    # Step 3: Collected data comes with the finishing reply; only older servers need the state call
+    log_step("📝 Step 3: Retrieving intake state...")
+    try:
+        if intake_data is None:
+            response = SESSION.get(
+                f"{BASE_URL}/api/patient/{patient_id}/intake/state",
+                params={"session_id": session_id},
+                timeout=TIMEOUT
             )
             response.raise_for_status()
-            reply_result = response.json()
+            intake_data = orjson.loads(response.content)["answers"]
 
-            if reply_result.get("finished"):
-                print(f"✓ Intake completed after {i} questions")
-                summary = reply_result.get("summary", {})
-                print_json(summary, "Intake Summary")
-                break
-            else:
-                print(f"  Q{i}: {answer} → Next: {reply_result.get('next_prompt', 'N/A')[:60]}...")
+        log.info("✓ Retrieved %s data points from intake", len(intake_data))
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error answering question {i}: {e}")
-            return False
+    except requests.exceptions.RequestException as e:
+        log.error("❌ Error retrieving intake state: %s", e)
+        return None
 
-    # Step 3: Get intake state to retrieve collected data
-    print("\n📝 Step 3: Retrieving intake state...")
-    try:
-        response = requests.get(
-            f"{BASE_URL}/api/patient/{patient_id}/intake/state",
-            params={"session_id": session_id}
-        )
-        response.raise_for_status()
-        state_result = response.json()
+    return intake_data
 
-        intake_data = state_result["answers"]
-        print(f"✓ Retrieved {len(intake_data)} data points from intake")
+@flushes_log
+def test_intake_analysis_flow(patient_id: int = PATIENT_ID):
+    """
+    Test Workflow 1: Intake Analysis Flow
 
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error retrieving intake state: {e}")
-        return False
+    Steps:
+    1. Start intake session
+    2. Answer all intake questions
+    3. Complete intake and get analysis
+    4. Verify Alzheimer's prediction, diagnosis, and treatment plan
+    """
+
+    print_section("WORKFLOW 1: INTAKE ANALYSIS FLOW")
+
+    if SKIP_INTAKE_LOOP:
+        # Benchmark mode: send the locally assembled record straight to the analyzer
+        log.info("⏭️  SKIP_INTAKE_LOOP set: skipping Steps 1-3 and analyzing the local intake record")
+        intake_data = dict(SAMPLE_INTAKE_DATA)
+    else:
+        intake_data = run_intake_steps(patient_id)
+        if intake_data is None:
+            return False, None
 
     # Step 4: Analyze intake data (Alzheimer's prediction + diagnosis + treatment plan)
-    print("\n🔬 Step 4: Analyzing intake data with Alzheimer's prediction...")
+    log_step("🔬 Step 4: Analyzing intake data with Alzheimer's prediction...")
     try:
-        response = requests.post(
+        response = post_json(
             f"{BASE_URL}/api/patient/{patient_id}/intake/analyze",
-            json={
+            {
                 "patient_id": patient_id,
                 "intake_data": intake_data
-            }
+            },
+            stream=True
         )
         response.raise_for_status()
-        analysis_result = response.json()
+        # The full analysis goes straight to disk as it arrives
+        analysis_result = stream_json_to_file(response, "intake_analysis_result.json")
 
-        print_json({
-            "alzheimers_diagnosis": analysis_result["alzheimers_prediction"]["diagnosis_label"],
-            "alzheimers_probability": f"{analysis_result['alzheimers_prediction']['probability_alzheimers']:.2%}",
-            "risk_level": analysis_result["diagnosis_analysis"]["risk_level"],
-            "predicted_diagnosis": analysis_result["diagnosis_analysis"]["predicted_diagnosis"],
-            "analysis_method": analysis_result["analysis_method"]
-        }, "Analysis Results")
+        print_json(analysis_highlights(analysis_result), "Analysis Results")
 
-        print("✓ Patient Portfolio Generated")
-        print("✓ Diagnosis Analysis Completed")
-        print("✓ Treatment Plan Created")
-        print("✓ Chatbot Config Generated")
+        log.info("✓ Patient Portfolio Generated")
+        log.info("✓ Diagnosis Analysis Completed")
+        log.info("✓ Treatment Plan Created")
+        log.info("✓ Chatbot Config Generated")
 
-        # Save full analysis to file
-        with open("intake_analysis_result.json", "w") as f:
-            json.dump(analysis_result, f, indent=2)
-
-        print("\n✓ Full analysis saved to intake_analysis_result.json")
+        log.info("\n✓ Full analysis saved to intake_analysis_result.json")
 
         return True, analysis_result
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error analyzing intake: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}")
+        log.error("❌ Error analyzing intake: %s", e)
+        log_error_body(e)
         return False, None
 
 # ============================================================================
 # WORKFLOW 2: ROUTINE CHAT FLOW
 # ============================================================================
 
-def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
+@flushes_log
+def test_routine_chat_flow(analysis_result: Dict[str, Any] = None, patient_id: int = PATIENT_ID):
     """
     Test Workflow 2: Routine Chat Flow
 
@@ -201,148 +544,108 @@ def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
 
     print_section("WORKFLOW 2: ROUTINE CHAT FLOW")
 
-    patient_id = 54321
-
     # If no analysis result provided, use sample data
     if not analysis_result:
-        print("⚠️  No analysis result provided, using sample data...")
-        sample_intake_data = {
-            "Age": 72, "Gender": 0, "Ethnicity": 0, "EducationLevel": 2,
-            "BMI": 25.7, "Smoking": 0, "AlcoholConsumption": 2,
-            "PhysicalActivity": 5, "DietQuality": 2, "SleepQuality": 6,
-            "FamilyHistoryAlzheimers": 1, "CardiovascularDisease": 0,
-            "Diabetes": 1, "Depression": 1, "HeadInjury": 0,
-            "Hypertension": 1, "SystolicBP": 142, "DiastolicBP": 88,
-            "CholesterolTotal": 215, "CholesterolLDL": 135,
-            "CholesterolHDL": 48, "CholesterolTriglycerides": 160,
-            "MMSE": 21, "FunctionalAssessment": 72, "ADL": 78,
-            "MemoryComplaints": 1, "BehavioralProblems": 0,
-            "Confusion": 1, "Disorientation": 1, "PersonalityChanges": 0,
-            "DifficultyCompletingTasks": 1, "Forgetfulness": 1
-        }
+        log.info("⚠️  No analysis result provided, using sample data...")
 
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/patient/{patient_id}/intake/analyze",
-                json={"patient_id": patient_id, "intake_data": sample_intake_data}
-            )
-            response.raise_for_status()
-            analysis_result = response.json()
+            analysis_result = analyze_intake(patient_id, SAMPLE_INTAKE_DATA)
         except Exception as e:
-            print(f"❌ Error getting analysis: {e}")
+            log.error("❌ Error getting analysis: %s", e)
             return False
 
     # Step 1: Initialize chatbot
-    print("\n🤖 Step 1: Initializing chatbot with treatment plan...")
+    log_step("🤖 Step 1: Initializing chatbot with treatment plan...")
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/patient/{patient_id}/chatbot/initialize",
-            json={
-                "patient_id": patient_id,
-                "patient_portfolio": analysis_result["patient_portfolio"],
-                "treatment_plan": analysis_result["treatment_plan"],
-                "chatbot_config": analysis_result["companion_chatbot_config"]
-            }
-        )
-        response.raise_for_status()
-        init_result = response.json()
+        init_result = initialize_chatbot(patient_id, analysis_result)
 
-        print(f"✓ Chatbot initialized: {init_result['chatbot_id']}")
-        print(f"  Status: {init_result['status']}")
+        log.info("✓ Chatbot initialized: %s", init_result['chatbot_id'])
+        log.info("  Status: %s", init_result['status'])
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error initializing chatbot: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}")
+        log.error("❌ Error initializing chatbot: %s", e)
+        log_error_body(e)
         return False
 
     # Step 2: Start daily check-in chat session
-    print("\n💬 Step 2: Starting daily check-in session...")
+    log_step("💬 Step 2: Starting daily check-in session...")
     try:
-        response = requests.post(
+        response = post_json(
             f"{BASE_URL}/api/patient/{patient_id}/chat/start",
-            json={
+            {
                 "patient_id": patient_id,
                 "chat_type": "daily_check_in"
             }
         )
         response.raise_for_status()
-        chat_start = response.json()
+        chat_start = orjson.loads(response.content)
 
         session_id = chat_start["session_id"]
-        print(f"✓ Chat session started: {session_id}")
-        print(f"  Bot: {chat_start['chatbot_message']}")
-        print(f"  Chat type: {chat_start['chat_type']}")
+        log.info("✓ Chat session started: %s", session_id)
+        log.info("  Bot: %s", chat_start['chatbot_message'])
+        log.info("  Chat type: %s", chat_start['chat_type'])
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error starting chat: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}")
+        log.error("❌ Error starting chat: %s", e)
+        log_error_body(e)
         return False
 
     # Step 3: Simulate routine check-in conversation
-    print("\n💬 Step 3: Simulating routine check-in conversation...")
+    log_step("💬 Step 3: Simulating routine check-in conversation...")
 
-    conversation = [
-        "I'm feeling a bit confused today",
-        "I didn't sleep well last night, maybe 4 hours",
-        "Yes, I took my morning medications",
-        "My energy is very low, about a 3 out of 10",
-        "I forgot to eat breakfast again",
-        "I'm having trouble remembering what day it is"
-    ]
+    conversation = CHAT_MESSAGES
 
     chat_interactions = []
 
+    # One minute apart, alternating patient/bot, starting at the check-in time
+    base = datetime(2025, 10, 4, 14, 30, tzinfo=timezone.utc)
+    stamps = [(base + timedelta(minutes=m)).isoformat().replace("+00:00", "Z") for m in range(len(conversation) * 2)]
+
+    post_message = functools.partial(post_json, f"{BASE_URL}/api/patient/chat/message")
+
     for i, patient_msg in enumerate(conversation, 1):
-        print(f"\n  Turn {i}:")
-        print(f"  Patient: {patient_msg}")
+        log.info("\n  Turn %s:", i)
+        log.info("  Patient: %s", patient_msg)
 
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/patient/chat/message",
-                json={
-                    "session_id": session_id,
-                    "patient_message": patient_msg
-                }
-            )
+            response = post_message({"session_id": session_id, "patient_message": patient_msg})
             response.raise_for_status()
-            chat_response = response.json()
+            chat_response = orjson.loads(response.content)
 
-            print(f"  Bot: {chat_response['chatbot_message']}")
+            log.info("  Bot: %s", chat_response['chatbot_message'])
 
             chat_interactions.append({
-                "timestamp": f"2025-10-04T{14+i//10}:{30+(i*5)%60:02d}:00Z",
+                "timestamp": stamps[2 * (i - 1)],
                 "speaker": "patient",
                 "message": patient_msg
             })
 
             chat_interactions.append({
-                "timestamp": f"2025-10-04T{14+i//10}:{31+(i*5)%60:02d}:00Z",
+                "timestamp": stamps[2 * (i - 1) + 1],
                 "speaker": "bot",
                 "message": chat_response['chatbot_message']
             })
 
             if chat_response.get("activity_completed"):
-                print("    ✓ Activity completed")
+                log.info("    ✓ Activity completed")
 
             if chat_response.get("conversation_complete"):
-                print("\n  ✓ Conversation complete!")
+                log.info("\n  ✓ Conversation complete!")
                 break
 
         except requests.exceptions.RequestException as e:
-            print(f"  ❌ Error in turn {i}: {e}")
+            log.error("  ❌ Error in turn %s: %s", i, e)
             continue
 
     # Step 4: End chat session and get summary
-    print("\n📊 Step 4: Ending chat session and retrieving summary...")
+    log_step("📊 Step 4: Ending chat session and retrieving summary...")
     try:
-        response = requests.post(
+        response = post_json(
             f"{BASE_URL}/api/patient/chat/end",
-            json={"session_id": session_id}
+            {"session_id": session_id}
         )
         response.raise_for_status()
-        end_result = response.json()
+        end_result = orjson.loads(response.content)
 
         print_json({
             "completed_activities": end_result["completed_activities"],
@@ -350,19 +653,17 @@ def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
         }, "Chat Session Metrics")
 
         # Save chat log
-        with open("routine_chat_log.json", "w") as f:
-            json.dump(end_result, f, indent=2)
+        save_json("routine_chat_log.json", end_result)
 
-        print("✓ Chat log saved to routine_chat_log.json")
+        log.info("✓ Chat log saved to routine_chat_log.json")
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error ending chat: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}")
+        log.error("❌ Error ending chat: %s", e)
+        log_error_body(e)
         return False
 
     # Step 5: Analyze conversation for symptom/mood changes
-    print("\n🔍 Step 5: Analyzing conversation for symptom changes...")
+    log_step("🔍 Step 5: Analyzing conversation for symptom changes...")
 
     # Prepare conversation record for analysis
     conversation_record = {
@@ -390,8 +691,8 @@ def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
     }
 
     # Note: This would call the conversation analyzer, but we'll simulate the output
-    print("  ⚠️  Conversation analyzer requires Claude API key")
-    print("  Simulated analysis output:")
+    log.info("  ⚠️  Conversation analyzer requires Claude API key")
+    log.info("  Simulated analysis output:")
 
     simulated_analysis = {
         "llm_analysis": {
@@ -435,13 +736,12 @@ def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
     print_json(simulated_analysis, "Conversation Analysis (Simulated)")
 
     # Save conversation analysis
-    with open("conversation_analysis.json", "w") as f:
-        json.dump({
-            "conversation_record": conversation_record,
-            "analysis_result": simulated_analysis
-        }, f, indent=2)
+    save_json("conversation_analysis.json", {
+        "conversation_record": conversation_record,
+        "analysis_result": simulated_analysis
+    })
 
-    print("✓ Conversation analysis saved to conversation_analysis.json")
+    log.info("✓ Conversation analysis saved to conversation_analysis.json")
 
     return True
 
@@ -449,58 +749,117 @@ def test_routine_chat_flow(analysis_result: Dict[str, Any] = None):
 # MAIN TEST RUNNER
 # ============================================================================
 
-def main():
-    """Run both workflow tests"""
+def log_summary():
+    """Log the final summary after both workflows passed"""
+    log.info("\n%s", "="*70)
+    log.info("  TEST SUMMARY")
+    log.info("%s", "="*70)
+    log.info("\n✅ All workflows completed successfully!")
+    if RESULTS_ARCHIVE:
+        log.info("\nGenerated archive: %s", RESULTS_ARCHIVE)
+    else:
+        log.info("\nGenerated files:")
+    log.info("  - intake_analysis_result.json")
+    log.info("  - routine_chat_log.json")
+    log.info("  - conversation_analysis.json")
+    log.info("\n%s", "="*70)
+
+async def run_workflows_parallel():
+    """Run both workflows at once; Workflow 2 then generates its own analysis result for its own patient"""
+    async with asyncio.TaskGroup() as tg:
+        intake_task = tg.create_task(asyncio.to_thread(test_intake_analysis_flow))
+        chat_task = tg.create_task(asyncio.to_thread(test_routine_chat_flow, None, PARALLEL_CHAT_PATIENT_ID))
+    return intake_task.result(), chat_task.result()
+
+def run_session_benchmark(patient_id: int, n_sessions: int):
+    """Drive n_sessions concurrent intake sessions, then n_sessions concurrent chat sessions for patient_id"""
+    print_section(f"SESSION BENCHMARK: {n_sessions} CONCURRENT SESSIONS")
+
+    patient_ids = list(range(SESSION_PATIENT_ID_START, SESSION_PATIENT_ID_START + n_sessions))
+    for name, run in (
+        ("intake", lambda: run_intake_sessions(patient_ids)),
+        ("chat", lambda: run_chat_sessions(patient_id, CHAT_MESSAGES, n_sessions)),
+    ):
+        started = time.perf_counter()
+        try:
+            results = asyncio.run(run())
+        except httpx.HTTPError as e:
+            log.error("❌ %s sessions failed: %s", name.capitalize(), e)
+            return False
+        elapsed = time.perf_counter() - started
+        turns = sum(len(replies) for replies in results)
+        log.info("✓ %s %s sessions, %s replies in %.2fs (%.1f sessions/s)",
+                 len(results), name, turns, elapsed, len(results) / elapsed)
+    return True
 
-    print("\n" + "="*70)
-    print("  COGNICARE WORKFLOW TESTS")
-    print("="*70)
-    print("\nTesting two main workflows:")
-    print("1. Intake Analysis Flow")
-    print("2. Routine Chat Flow")
-    print("\n" + "="*70)
+def main(parallel: bool = False, sessions: int = 0):
+    """Run both workflow tests, then the concurrent session benchmark when sessions > 0"""
+
+    log.info("\n%s", "="*70)
+    log.info("  COGNICARE WORKFLOW TESTS")
+    log.info("%s", "="*70)
+    log.info("\nTesting two main workflows:")
+    log.info("1. Intake Analysis Flow")
+    log.info("2. Routine Chat Flow")
+    log.info("\n%s", "="*70)
+
+    if parallel:
+        (intake_success, _), chat_success = asyncio.run(run_workflows_parallel())
+        for name, success in (("Intake Analysis Flow", intake_success), ("Routine Chat Flow", chat_success)):
+            if success:
+                log.info("\n✅ %s PASSED", name)
+            else:
+                log.error("\n❌ %s FAILED", name)
+        if intake_success and chat_success:
+            log_summary()
+            if sessions:
+                run_session_benchmark(PARALLEL_CHAT_PATIENT_ID, sessions)
+        return
 
     # Test Workflow 1: Intake Analysis
     intake_success, analysis_result = test_intake_analysis_flow()
 
     if not intake_success:
-        print("\n❌ Intake Analysis Flow FAILED")
-        print("Stopping tests...")
+        log.error("\n❌ Intake Analysis Flow FAILED")
+        log.info("Stopping tests...")
         return
 
-    print("\n✅ Intake Analysis Flow PASSED")
+    log.info("\n✅ Intake Analysis Flow PASSED")
 
     # Test Workflow 2: Routine Chat
     chat_success = test_routine_chat_flow(analysis_result)
 
     if not chat_success:
-        print("\n❌ Routine Chat Flow FAILED")
+        log.error("\n❌ Routine Chat Flow FAILED")
         return
 
-    print("\n✅ Routine Chat Flow PASSED")
+    log.info("\n✅ Routine Chat Flow PASSED")
+
+    log_summary()
 
-    # Final summary
-    print("\n" + "="*70)
-    print("  TEST SUMMARY")
-    print("="*70)
-    print("\n✅ All workflows completed successfully!")
-    print("\nGenerated files:")
-    print("  - intake_analysis_result.json")
-    print("  - routine_chat_log.json")
-    print("  - conversation_analysis.json")
-    print("\n" + "="*70)
+    if sessions:
+        run_session_benchmark(PATIENT_ID, sessions)
 
 if __name__ == "__main__":
-    print("\n🚀 Starting CognifyCare Workflow Tests...")
-    print("Make sure the server is running: python test_app.py")
-    print("\nPress Enter to continue or Ctrl+C to cancel...")
+    log.info("\n🚀 Starting CognifyCare Workflow Tests...")
+    log.info("Make sure the server is running: python test_app.py")
+    log.info("\nPress Enter to continue or Ctrl+C to cancel...")
+
+    _log_buffer.flush()
 
     try:
         input()
-        main()
+        args = sys.argv[1:]
+        main(
+            parallel="--parallel" in args,
+            sessions=int(args[args.index("--sessions") + 1]) if "--sessions" in args[:-1] else 0
+        )
+        if RESULTS_ARCHIVE:
+            write_results_archive()
     except KeyboardInterrupt:
-        print("\n\n❌ Tests cancelled by user.")
+        log.error("\n\n❌ Tests cancelled by user.")
     except Exception as e:
-        print(f"\n\n❌ Unexpected error: {e}")
+        log.error("\n\n❌ Unexpected error: %s", e)
+        _log_buffer.flush()
         import traceback
         traceback.print_exc()
@@ -3,11 +3,61 @@
 Test script for the direct analysis endpoint using DiagnosisTreatmentPlanner
 """
 
+import asyncio
+import httpx
 import requests
-import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from _http_utils import (
+    BASE_URL, HTTP2_AVAILABLE, SESSION, USE_HTTPX,
+    api_health, configure_cache, dumps_json, loads_json, post_cached, save_json, transfer_summary,
+)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# COGNIFY_MSGPACK=1 asks the batch callers for MessagePack responses (JSON stays the fallback)
+USE_MSGPACK = os.getenv("COGNIFY_MSGPACK") == "1" and MSGPACK_AVAILABLE
+BATCH_HEADERS = {"Accept": "application/msgpack, application/json;q=0.8"} if USE_MSGPACK else {}
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Headline fields and counted lists read in --summary-only mode (dotted paths into the response)
+SUMMARY_FIELDS = (
+    "alzheimers_prediction.diagnosis_label",
+    "alzheimers_prediction.probability_alzheimers",
+    "diagnosis_analysis.predicted_diagnosis",
+    "diagnosis_analysis.risk_level",
+    "diagnosis_analysis.confidence_score",
+    "analysis_method",
+)
+SUMMARY_LISTS = (
+    "treatment_plan.immediate_actions",
+    "treatment_plan.lifestyle_interventions",
+    "treatment_plan.medical_management",
+    "treatment_plan.support_services",
+)
+
+def decode_body(response) -> dict:
+    """Decode a response body according to its content type (MessagePack or JSON)"""
+    if response.headers.get("content-type", "").startswith("application/msgpack"):
+        return msgpack.unpackb(response.content, raw=False)
+    return loads_json(response.content)
+
+# Saved responses are compact JSON for re-ingestion; --pretty indents them for reading
+PRETTY_JSON = False
+
 # Sample patient data for testing
 SAMPLE_PATIENT_DATA = {
     "Age": 75,
@@ -46,36 +96,33 @@ SAMPLE_PATIENT_DATA = {
     "Forgetfulness": 1  # Yes
 }
 
+# The sample request body never changes, so encode it once
+PAYLOAD_BYTES = dumps_json({"patient_data": SAMPLE_PATIENT_DATA})
+
 def test_direct_analysis_endpoint():
     """Test the direct analysis endpoint"""
     
     print("Testing Direct Analysis Endpoint")
     print("=" * 50)
     
-    base_url = "http://localhost:8000"
-    endpoint = f"{base_url}/api/analysis/direct"
-    
-    payload = {
-        "patient_data": SAMPLE_PATIENT_DATA
-    }
+    endpoint = f"{BASE_URL}/api/analysis/direct"
     
     print(f"Endpoint: {endpoint}")
     print(f"Patient Data Keys: {list(SAMPLE_PATIENT_DATA.keys())}")
     print()
     
     try:
-        response = requests.post(
-            endpoint,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
+        started = time.perf_counter()
+        response = post_cached(endpoint, PAYLOAD_BYTES)
+        elapsed_ms = (time.perf_counter() - started) * 1000
         
         print(f"Response Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = loads_json(response.content)
             print("✓ Direct analysis completed successfully")
+            print(f"  Transfer: {transfer_summary(response)}")
+            print(f"  Round trip: {elapsed_ms:.1f} ms ({'httpx' if USE_HTTPX else 'requests'})")
             print()
             
             # Display key results
@@ -179,8 +226,7 @@ def test_direct_analysis_endpoint():
             print()
             
             # Save full response to file for inspection
-            with open('direct_analysis_response.json', 'w') as f:
-                json.dump(result, f, indent=2)
+            save_json('direct_analysis_response.json', result, pretty=PRETTY_JSON)
             print("✓ Full response saved to 'direct_analysis_response.json'")
             
             return result
@@ -190,12 +236,12 @@ def test_direct_analysis_endpoint():
             print(f"Response: {response.text}")
             return None
             
-    except requests.exceptions.ConnectionError:
+    except (requests.exceptions.ConnectionError, httpx.ConnectError):
         print("✗ Connection Error: Make sure the API server is running on localhost:8000")
         print("  Start the server with: uvicorn app:app --reload")
         return None
         
-    except requests.exceptions.Timeout:
+    except (requests.exceptions.Timeout, httpx.TimeoutException):
         print("✗ Timeout Error: Request took too long")
         return None
         
@@ -203,30 +249,108 @@ def test_direct_analysis_endpoint():
         print(f"✗ Unexpected Error: {e}")
         return None
 
-def test_api_health():
-    """Test if the API is running and healthy"""
-    
-    base_url = "http://localhost:8000"
+def extract_summary(response):
+    """Read only the SUMMARY_FIELDS values and SUMMARY_LISTS lengths from a streamed response.
+
+    With ijson the body is parsed incrementally and nothing else is materialized;
+    without it the body is parsed in full and the same fields are picked out.
+    """
+    if IJSON_AVAILABLE:
+        response.raw.decode_content = True
+        fields, lists = set(SUMMARY_FIELDS), set(SUMMARY_LISTS)
+        summary = {**dict.fromkeys(SUMMARY_FIELDS), **dict.fromkeys(SUMMARY_LISTS, 0)}
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            if prefix in fields and event not in ("start_map", "start_array"):
+                summary[prefix] = value
+            elif prefix.endswith(".item") and prefix[:-5] in lists and event not in ("map_key", "end_map", "end_array"):
+                summary[prefix[:-5]] += 1
+        return summary
+
+    result = loads_json(response.content)
+    summary = {}
+    for path in SUMMARY_FIELDS + SUMMARY_LISTS:
+        value = result
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        summary[path] = len(value or []) if path in SUMMARY_LISTS else value
+    return summary
+
+def test_direct_analysis_summary():
+    """Call the direct analysis endpoint and print only the headline fields"""
     
+    endpoint = f"{BASE_URL}/api/analysis/direct"
     try:
-        response = requests.get(f"{base_url}/", timeout=5)
-        if response.status_code == 200:
-            health = response.json()
-            print("API Health Check:")
-            print(f"  Service: {health.get('service', 'Unknown')}")
-            print(f"  Alzheimer's Predictor: {health.get('alzheimers_predictor', 'Unknown')}")
-            print(f"  LLM Configured: {health.get('llm_configured', 'Unknown')}")
-            return True
+        response = SESSION.post(endpoint, data=PAYLOAD_BYTES, timeout=30, stream=True)
+        response.raise_for_status()
+        summary = extract_summary(response)
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Error: {e}")
+        return None
+    
+    print(f"📊 SUMMARY ({'streamed' if IJSON_AVAILABLE else 'full parse'}):")
+    for path, value in summary.items():
+        print(f"  {path}: {value}")
+    return summary
+
+def batch_direct_analysis(patient_records, max_workers=8, base_url=BASE_URL):
+    """Analyze many patient records concurrently through the shared session.
+
+    Returns one entry per record, in input order: the analysis result, or None
+    if that record's request failed.
+    """
+    endpoint = f"{base_url}/api/analysis/direct"
+
+    def analyze(record):
+        response = SESSION.post(endpoint, data=dumps_json({"patient_data": record}), headers=BATCH_HEADERS, timeout=30)
+        response.raise_for_status()
+        return decode_body(response)
+
+    results = [None] * len(patient_records)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(analyze, record): i for i, record in enumerate(patient_records)}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"✗ Record {futures[future]} failed: {e}")
+    return results
+
+async def run_batch(patient_records, base_url=BASE_URL, max_connections=16):
+    """Analyze many patient records concurrently over one async client.
+
+    Uses HTTP/2 when h2 is installed so the requests share multiplexed
+    connections. Returns one entry per record, in input order: the analysis
+    result, or None if that record's request failed.
+    """
+    endpoint = f"{base_url}/api/analysis/direct"
+    async with httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=max_connections),
+        headers={"Content-Type": "application/json", **BATCH_HEADERS},
+        timeout=30
+    ) as client:
+        responses = await asyncio.gather(
+            *(client.post(endpoint, content=dumps_json({"patient_data": record})) for record in patient_records),
+            return_exceptions=True
+        )
+    
+    results = []
+    for i, response in enumerate(responses):
+        if isinstance(response, Exception) or response.status_code != 200:
+            print(f"✗ Record {i} failed: {response if isinstance(response, Exception) else response.status_code}")
+            results.append(None)
         else:
-            print(f"✗ API Health Check Failed: {response.status_code}")
-            return False
-            
-    except requests.exceptions.ConnectionError:
-        print("✗ API not running. Start with: uvicorn app:app --reload")
-        return False
-    except Exception as e:
-        print(f"✗ Health check error: {e}")
-        return False
+            results.append(decode_body(response))
+    return results
+
+def load_records(path):
+    """Read one patient_data object per line from a JSONL file"""
+    with open(path, 'rb') as f:
+        return [loads_json(line) for line in f if line.strip()]
+
+def test_api_health():
+    """Test if the API is running and healthy"""
+    return api_health(SESSION)
 
 def demonstrate_usage():
     """Demonstrate how to use the direct analysis endpoint"""
@@ -339,10 +463,30 @@ if response.status_code == 200:
     """)
 
 if __name__ == "__main__":
+    configure_cache(sys.argv[1:])
+    PRETTY_JSON = "--pretty" in sys.argv[1:]
+    
     print("CognifyCare Direct Analysis Test")
     print("=" * 50)
     print()
     
+    # Headline fields only, without building or saving the full response
+    if "--summary-only" in sys.argv[1:]:
+        if test_api_health():
+            print()
+            test_direct_analysis_summary()
+        sys.exit(0)
+    
+    # Async batch over every record in a JSONL file
+    if "--batch" in sys.argv[1:-1]:
+        records = load_records(sys.argv[sys.argv.index("--batch") + 1])
+        results = asyncio.run(run_batch(records))
+        ok = [r for r in results if r is not None]
+        print(f"✓ Batch analysis: {len(ok)}/{len(records)} records analyzed")
+        for result in ok:
+            print(f"  {result['alzheimers_prediction']['diagnosis_label']} - risk {result['diagnosis_analysis']['risk_level']}")
+        sys.exit(0 if len(ok) == len(records) else 1)
+    
     # Check API health first
     if test_api_health():
         print()
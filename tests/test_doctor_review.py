@@ -4,89 +4,194 @@ Test Doctor Review Endpoints
 Tests the complete doctor workflow for reviewing and updating treatment plans
 """
 
-import requests
-import json
-from typing import Dict, Any
+import httpx
+import itertools
+import orjson
+import os
+import pytest
+import sys
+from typing import Dict, Any, List
+
+# Sample intake data shared by every patient set up in this run
+INTAKE_DATA = {
+    "Age": 72, "Gender": 0, "Ethnicity": 0, "EducationLevel": 2,
+    "BMI": 25.7, "Smoking": 0, "AlcoholConsumption": 2,
+    "PhysicalActivity": 5, "DietQuality": 2, "SleepQuality": 6,
+    "FamilyHistoryAlzheimers": 1, "CardiovascularDisease": 0,
+    "Diabetes": 1, "Depression": 1, "HeadInjury": 0,
+    "Hypertension": 1, "SystolicBP": 142, "DiastolicBP": 88,
+    "CholesterolTotal": 215, "CholesterolLDL": 135,
+    "CholesterolHDL": 48, "CholesterolTriglycerides": 160,
+    "MMSE": 21, "FunctionalAssessment": 72, "ADL": 78,
+    "MemoryComplaints": 1, "BehavioralProblems": 0,
+    "Confusion": 1, "Disorientation": 1, "PersonalityChanges": 0,
+    "DifficultyCompletingTasks": 1, "Forgetfulness": 1
+}
+
+# Test 1: approve the intake plan with extra cognitive work and closer monitoring
+DOCTOR_DECISION_APPROVE = {
+    "approved": True,
+    "notes": "Approved with additional cognitive exercises and increased monitoring frequency",
+    "treatment_changes": {
+        "lifestyle_interventions": [
+            "Daily cognitive training exercises - 20 minutes",
+            "Memory journal keeping"
+        ],
+        "monitoring_schedule": {
+            "cognitive_assessment": "Every 3 months (increased from 6)",
+            "medical_follow_up": "Every 6 weeks"
+        }
+    },
+    "urgency_level": "soon"
+}
+
+# Test 2: respond to a declining conversation analysis
+DOCTOR_DECISION_CONVERSATION = {
+    "approved": True,
+    "notes": "Concerning decline observed. Adding medication review and increasing support services. Scheduling urgent neurology consultation.",
+    "treatment_changes": {
+        "immediate_actions": [
+            "Schedule urgent neurology consultation within 1 week",
+            "Complete medication review and assessment",
+            "Arrange home safety evaluation"
+        ],
+        "medical_management": [
+            "Consider adjusting cholinesterase inhibitor dosage",
+            "Evaluate for depression treatment"
+        ],
+        "support_services": [
+            "Increase caregiver visits to daily",
+            "Arrange respite care for caregiver",
+            "Connect with adult day care program"
+        ],
+        "monitoring_schedule": {
+            "cognitive_assessment": "Every 2 months",
+            "medical_follow_up": "Every 2 weeks until stable",
+            "caregiver_check_in": "Daily"
+        }
+    },
+    "urgency_level": "urgent"
+}
+
+# Test 4: review without changes
+DOCTOR_DECISION_REJECT = {
+    "approved": False,
+    "notes": "Analysis reviewed. Current treatment plan is adequate. No changes needed at this time. Will re-evaluate in 3 months.",
+    "treatment_changes": None,
+    "urgency_level": "routine"
+}
+
+# Each setup gets a fresh patient ID (xdist workers count from separate ranges); the
+# analysis depends only on the intake data, so each process analyzes an intake once
+_WORKER = int(os.getenv("PYTEST_XDIST_WORKER", "gw0")[2:])
+_pid_counter = itertools.count(12345 + 1000 * _WORKER)
+_analysis_results: Dict[tuple, Dict[str, Any]] = {}
+
+# Chatbot init fields taken from each analysis, picked out once (keyed like _analysis_results)
+_init_fields: Dict[tuple, Dict[str, Any]] = {}
 
-BASE_URL = "http://localhost:8000"
+# Review/update calls echo the patient's current plan, replacing a follow-up GET /current-plan
+INCLUDE_CURRENT_PLAN = {"include_current_plan": 1}
+
+# Request bodies are encoded with orjson and sent as raw content
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Full response dumps and section headers only with VERBOSE_TESTS set; check and summary lines always print
+VERBOSE = bool(os.getenv("VERBOSE_TESTS"))
+
+_HASH = "#" * 70
+_EQ = "=" * 70
 
 def print_json(data: Dict[str, Any], title: str = ""):
-    """Pretty print JSON data"""
+    """Pretty print JSON data (VERBOSE only)"""
+    if not VERBOSE:
+        return
     if title:
-        print(f"\n{'='*70}")
-        print(f"  {title}")
-        print('='*70)
-    print(json.dumps(data, indent=2))
+        print(f"\n{_EQ}\n  {title}\n{_EQ}")
+    print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
     print()
 
 def print_section(title: str):
-    """Print section header"""
-    print(f"\n{'#'*70}")
-    print(f"# {title}")
-    print(f"{'#'*70}\n")
+    """Print section header (VERBOSE only)"""
+    if not VERBOSE:
+        return
+    print(f"\n{_HASH}\n# {title}\n{_HASH}\n")
+
+def _json(response: httpx.Response) -> Dict[str, Any]:
+    """Decoded body of a successful response; raises httpx.HTTPStatusError otherwise"""
+    if not response.is_success:
+        response.raise_for_status()
+    return orjson.loads(response.content)
+
+def fetch_verifications(client: httpx.Client, *paths: str) -> List[Dict[str, Any]]:
+    """GET verification endpoints one at a time, in the order given, and return their JSON bodies"""
+    return [_json(client.get(path)) for path in paths]
 
 # ==================== Setup: Create Patient with Treatment Plan ====================
 
-def setup_patient_with_treatment_plan():
+def analyze_and_init(client: httpx.Client, patient_id: int, intake_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze intake and initialize the patient's chatbot from it in one call"""
+    response = client.post(
+        f"/api/patient/{patient_id}/intake/analyze_and_init",
+        content=orjson.dumps({"intake_data": intake_data}),
+        headers=JSON_HEADERS
+    )
+    return _json(response)
+
+def setup_patient_with_treatment_plan(client: httpx.Client):
     """Create a patient with intake analysis and initialized chatbot"""
 
-    patient_id = 12345
+    patient_id = next(_pid_counter)
 
     print_section("SETUP: Creating Patient with Treatment Plan")
 
-    # Sample intake data
-    intake_data = {
-        "Age": 72, "Gender": 0, "Ethnicity": 0, "EducationLevel": 2,
-        "BMI": 25.7, "Smoking": 0, "AlcoholConsumption": 2,
-        "PhysicalActivity": 5, "DietQuality": 2, "SleepQuality": 6,
-        "FamilyHistoryAlzheimers": 1, "CardiovascularDisease": 0,
-        "Diabetes": 1, "Depression": 1, "HeadInjury": 0,
-        "Hypertension": 1, "SystolicBP": 142, "DiastolicBP": 88,
-        "CholesterolTotal": 215, "CholesterolLDL": 135,
-        "CholesterolHDL": 48, "CholesterolTriglycerides": 160,
-        "MMSE": 21, "FunctionalAssessment": 72, "ADL": 78,
-        "MemoryComplaints": 1, "BehavioralProblems": 0,
-        "Confusion": 1, "Disorientation": 1, "PersonalityChanges": 0,
-        "DifficultyCompletingTasks": 1, "Forgetfulness": 1
-    }
+    # The first patient for an intake gets analysis + chatbot in one call; later
+    # patients reuse that analysis and only initialize their own chatbot
+    intake_key = tuple(sorted(INTAKE_DATA.items()))
+    if intake_key not in _analysis_results:
+        print("\n📋 Step 1: Analyzing patient intake and initializing chatbot...")
+        analysis_result = _analysis_results[intake_key] = analyze_and_init(client, patient_id, INTAKE_DATA)
+        print(f"✓ Analysis complete: {analysis_result['diagnosis_analysis']['predicted_diagnosis']}")
+        print(f"✓ Chatbot initialized: {analysis_result['chatbot_id']}")
+        return patient_id, analysis_result
 
-    # Step 1: Get intake analysis
     print("\n📋 Step 1: Analyzing patient intake...")
-    response = requests.post(
-        f"{BASE_URL}/api/patient/{patient_id}/intake/analyze",
-        json={"patient_id": patient_id, "intake_data": intake_data}
-    )
-    response.raise_for_status()
-    analysis_result = response.json()
-
-    print(f"✓ Analysis complete: {analysis_result['diagnosis_analysis']['predicted_diagnosis']}")
+    analysis_result = _analysis_results[intake_key]
+    print(f"✓ Analysis complete (reused): {analysis_result['diagnosis_analysis']['predicted_diagnosis']}")
 
     # Step 2: Initialize chatbot with treatment plan
     print("\n🤖 Step 2: Initializing chatbot...")
-    response = requests.post(
-        f"{BASE_URL}/api/patient/{patient_id}/chatbot/initialize",
-        json={
-            "patient_id": patient_id,
+    fields = _init_fields.get(intake_key)
+    if fields is None:
+        fields = _init_fields[intake_key] = {
             "patient_portfolio": analysis_result["patient_portfolio"],
             "treatment_plan": analysis_result["treatment_plan"],
             "chatbot_config": analysis_result["companion_chatbot_config"]
         }
+    response = client.post(
+        f"/api/patient/{patient_id}/chatbot/initialize",
+        content=orjson.dumps({"patient_id": patient_id, **fields}),
+        headers=JSON_HEADERS
     )
-    response.raise_for_status()
-    init_result = response.json()
+    init_result = _json(response)
 
     print(f"✓ Chatbot initialized: {init_result['chatbot_id']}")
 
     return patient_id, analysis_result
 
+@pytest.fixture
+def patient_setup(client: httpx.Client):
+    """A fresh patient with intake analysis and initialized chatbot, per test"""
+    return setup_patient_with_treatment_plan(client)
+
 # ==================== Test 1: Review Intake Analysis ====================
 
-def test_intake_analysis_review():
+def test_intake_analysis_review(client: httpx.Client, patient_setup):
     """Test doctor reviewing intake analysis and updating treatment plan"""
 
     print_section("TEST 1: Doctor Reviews Intake Analysis")
 
-    patient_id, analysis_result = setup_patient_with_treatment_plan()
+    patient_id, analysis_result = patient_setup
 
     # Doctor's decision to approve with modifications
     print("\n👨‍⚕️ Doctor reviews intake analysis...")
@@ -94,50 +199,36 @@ def test_intake_analysis_review():
     doctor_decision = {
         "patient_id": patient_id,
         "intake_analysis": analysis_result,
-        "doctor_decision": {
-            "approved": True,
-            "notes": "Approved with additional cognitive exercises and increased monitoring frequency",
-            "treatment_changes": {
-                "lifestyle_interventions": [
-                    "Daily cognitive training exercises - 20 minutes",
-                    "Memory journal keeping"
-                ],
-                "monitoring_schedule": {
-                    "cognitive_assessment": "Every 3 months (increased from 6)",
-                    "medical_follow_up": "Every 6 weeks"
-                }
-            },
-            "urgency_level": "soon"
-        }
+        "doctor_decision": DOCTOR_DECISION_APPROVE
     }
 
-    response = requests.post(
-        f"{BASE_URL}/api/doctor/review/intake",
-        json=doctor_decision
+    response = client.post(
+        "/api/doctor/review/intake",
+        params=INCLUDE_CURRENT_PLAN,
+        content=orjson.dumps(doctor_decision),
+        headers=JSON_HEADERS
     )
-    response.raise_for_status()
-    review_result = response.json()
+    review_result = _json(response)
 
     print_json(review_result, "Doctor Review Result")
 
     # Verify updates were applied
     print("\n🔍 Verifying treatment plan was updated...")
-    response = requests.get(f"{BASE_URL}/api/doctor/patient/{patient_id}/current-plan")
-    response.raise_for_status()
-    current_plan = response.json()
+    current_plan = review_result["current_treatment_plan"]
+    assert current_plan is not None, "Current treatment plan should be included"
 
-    print(f"✓ Treatment plan updated: {len(current_plan['current_treatment_plan'])} categories")
-    print(f"✓ Monitoring schedule updated: {current_plan['current_treatment_plan'].get('monitoring_schedule', {})}")
-
-    return patient_id
+    print(f"✓ Treatment plan updated: {len(current_plan)} categories")
+    print(f"✓ Monitoring schedule updated: {current_plan.get('monitoring_schedule', {})}")
 
 # ==================== Test 2: Review Conversation Analysis ====================
 
-def test_conversation_analysis_review(patient_id: int):
+def test_conversation_analysis_review(client: httpx.Client, patient_setup):
     """Test doctor reviewing conversation analysis and updating treatment"""
 
     print_section("TEST 2: Doctor Reviews Conversation Analysis")
 
+    patient_id, _ = patient_setup
+
     # Simulate conversation analysis showing concerning symptoms
     print("\n💬 Simulating conversation analysis with symptom changes...")
 
@@ -192,64 +283,47 @@ def test_conversation_analysis_review(patient_id: int):
     doctor_decision = {
         "patient_id": patient_id,
         "conversation_analysis": conversation_analysis,
-        "doctor_decision": {
-            "approved": True,
-            "notes": "Concerning decline observed. Adding medication review and increasing support services. Scheduling urgent neurology consultation.",
-            "treatment_changes": {
-                "immediate_actions": [
-                    "Schedule urgent neurology consultation within 1 week",
-                    "Complete medication review and assessment",
-                    "Arrange home safety evaluation"
-                ],
-                "medical_management": [
-                    "Consider adjusting cholinesterase inhibitor dosage",
-                    "Evaluate for depression treatment"
-                ],
-                "support_services": [
-                    "Increase caregiver visits to daily",
-                    "Arrange respite care for caregiver",
-                    "Connect with adult day care program"
-                ],
-                "monitoring_schedule": {
-                    "cognitive_assessment": "Every 2 months",
-                    "medical_follow_up": "Every 2 weeks until stable",
-                    "caregiver_check_in": "Daily"
-                }
-            },
-            "urgency_level": "urgent"
-        }
+        "doctor_decision": DOCTOR_DECISION_CONVERSATION
     }
 
-    response = requests.post(
-        f"{BASE_URL}/api/doctor/review/conversation",
-        json=doctor_decision
+    response = client.post(
+        "/api/doctor/review/conversation",
+        params=INCLUDE_CURRENT_PLAN,
+        content=orjson.dumps(doctor_decision),
+        headers=JSON_HEADERS
     )
-    response.raise_for_status()
-    review_result = response.json()
+    review_result = _json(response)
 
     print_json(review_result, "Doctor Review Result")
 
     # Verify updates were applied to chatbot
     print("\n🔍 Verifying chatbot config was updated...")
-    response = requests.get(f"{BASE_URL}/api/doctor/patient/{patient_id}/current-plan")
-    response.raise_for_status()
-    current_plan = response.json()
+    treatment_plan = review_result["current_treatment_plan"]
+    assert treatment_plan is not None, "Current treatment plan should be included"
+
+    # Further checks go in this list; they are fetched one after another, in order
+    (chatbot_status,) = fetch_verifications(
+        client,
+        f"/api/patient/{patient_id}/chatbot/status",
+    )
+    assert chatbot_status["status"] == "active", "Chatbot should still be active after the update"
 
     print(f"✓ Chatbot config updated")
-    print(f"✓ New monitoring schedule: {current_plan['current_treatment_plan'].get('monitoring_schedule', {})}")
+    print(f"✓ New monitoring schedule: {treatment_plan.get('monitoring_schedule', {})}")
 
     # Check that chatbot has new activities
-    treatment_plan = current_plan['current_treatment_plan']
     print(f"✓ Immediate actions: {len(treatment_plan.get('immediate_actions', []))} items")
     print(f"✓ Support services: {len(treatment_plan.get('support_services', []))} items")
 
 # ==================== Test 3: Direct Treatment Update ====================
 
-def test_direct_treatment_update(patient_id: int):
+def test_direct_treatment_update(client: httpx.Client, patient_setup):
     """Test direct treatment plan update by doctor"""
 
     print_section("TEST 3: Direct Treatment Plan Update")
 
+    patient_id, _ = patient_setup
+
     print("\n👨‍⚕️ Doctor makes direct treatment update...")
 
     update_request = {
@@ -267,53 +341,50 @@ def test_direct_treatment_update(patient_id: int):
         "reason": "Regular 3-month follow-up. Patient showing stable cognition, adding enrichment activities."
     }
 
-    response = requests.post(
-        f"{BASE_URL}/api/doctor/treatment/update",
-        json=update_request
+    response = client.post(
+        "/api/doctor/treatment/update",
+        params=INCLUDE_CURRENT_PLAN,
+        content=orjson.dumps(update_request),
+        headers=JSON_HEADERS
     )
-    response.raise_for_status()
-    update_result = response.json()
+    update_result = _json(response)
 
     print_json(update_result, "Direct Update Result")
 
     # Verify
     print("\n🔍 Verifying direct update was applied...")
-    response = requests.get(f"{BASE_URL}/api/doctor/patient/{patient_id}/current-plan")
-    response.raise_for_status()
-    current_plan = response.json()
+    current_plan = update_result["current_treatment_plan"]
+    assert current_plan is not None, "Current treatment plan should be included"
 
-    lifestyle = current_plan['current_treatment_plan'].get('lifestyle_interventions', [])
+    lifestyle = current_plan.get('lifestyle_interventions', [])
     print(f"✓ Lifestyle interventions now has {len(lifestyle)} items")
-    print(f"✓ Includes music therapy: {'music therapy' in str(lifestyle).lower()}")
+    has_music_therapy = any('music therapy' in str(item).lower() for item in lifestyle)
+    assert has_music_therapy, "Music therapy should be in lifestyle interventions"
+    print(f"✓ Includes music therapy: {has_music_therapy}")
 
 # ==================== Test 4: Rejected Review ====================
 
-def test_rejected_review():
+def test_rejected_review(client: httpx.Client, patient_setup):
     """Test doctor rejecting a review (no changes applied)"""
 
     print_section("TEST 4: Doctor Rejects Review (No Changes)")
 
-    patient_id, analysis_result = setup_patient_with_treatment_plan()
+    patient_id, analysis_result = patient_setup
 
     print("\n👨‍⚕️ Doctor reviews but does not approve changes...")
 
     doctor_decision = {
         "patient_id": patient_id,
         "intake_analysis": analysis_result,
-        "doctor_decision": {
-            "approved": False,
-            "notes": "Analysis reviewed. Current treatment plan is adequate. No changes needed at this time. Will re-evaluate in 3 months.",
-            "treatment_changes": None,
-            "urgency_level": "routine"
-        }
+        "doctor_decision": DOCTOR_DECISION_REJECT
     }
 
-    response = requests.post(
-        f"{BASE_URL}/api/doctor/review/intake",
-        json=doctor_decision
+    response = client.post(
+        "/api/doctor/review/intake",
+        content=orjson.dumps(doctor_decision),
+        headers=JSON_HEADERS
     )
-    response.raise_for_status()
-    review_result = response.json()
+    review_result = _json(response)
 
     print_json(review_result, "Rejected Review Result")
 
@@ -324,51 +395,6 @@ def test_rejected_review():
 
 # ==================== Main Test Runner ====================
 
-def main():
-    """Run all doctor review tests"""
-
-    print("\n" + "="*70)
-    print("  DOCTOR REVIEW ENDPOINT TESTS")
-    print("="*70)
-    print("\nTesting doctor review workflow for treatment plan updates")
-    print("="*70)
-
-    try:
-        # Test 1: Intake analysis review
-        patient_id = test_intake_analysis_review()
-        print("\n✅ Test 1 PASSED: Intake analysis review")
-
-        # Test 2: Conversation analysis review
-        test_conversation_analysis_review(patient_id)
-        print("\n✅ Test 2 PASSED: Conversation analysis review")
-
-        # Test 3: Direct treatment update
-        test_direct_treatment_update(patient_id)
-        print("\n✅ Test 3 PASSED: Direct treatment update")
-
-        # Test 4: Rejected review
-        test_rejected_review()
-        print("\n✅ Test 4 PASSED: Rejected review")
-
-        # Final summary
-        print("\n" + "="*70)
-        print("  TEST SUMMARY")
-        print("="*70)
-        print("\n✅ All doctor review tests PASSED!")
-        print("\nVerified functionality:")
-        print("  ✓ Doctor can review intake analysis and update treatment plans")
-        print("  ✓ Doctor can review conversation analysis and adjust care")
-        print("  ✓ Doctor can make direct treatment plan updates")
-        print("  ✓ Doctor can reject reviews (no changes applied)")
-        print("  ✓ Chatbot configs are automatically updated with new plans")
-        print("  ✓ Treatment changes are properly merged into existing plans")
-        print("\n" + "="*70)
-
-    except Exception as e:
-        print(f"\n❌ Test FAILED: {e}")
-        import traceback
-        traceback.print_exc()
-
 if __name__ == "__main__":
     print("\n🚀 Starting Doctor Review Endpoint Tests...")
     print("Make sure the server is running on http://localhost:8000")
@@ -376,10 +402,9 @@ if __name__ == "__main__":
 
     try:
         input()
-        main()
     except KeyboardInterrupt:
         print("\n\n❌ Tests cancelled by user.")
-    except Exception as e:
-        print(f"\n\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        sys.exit(1)
+
+    # Each test sets up its own patient, so pytest-xdist can spread them over workers (-n 4)
+    sys.exit(pytest.main([__file__, *sys.argv[1:]]))
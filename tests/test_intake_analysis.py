@@ -3,8 +3,12 @@
 Test script for the intake analysis endpoint
 """
 
-import requests
-import json
+import atexit
+
+from _http_utils import dumps_json, loads_json, make_client
+
+CLIENT = make_client()
+atexit.register(CLIENT.close)
 
 # Sample intake data (what would come from the intake flow)
 SAMPLE_INTAKE_DATA = {
@@ -44,24 +48,23 @@ SAMPLE_INTAKE_DATA = {
     "Forgetfulness": 1  # Yes
 }
 
+# Request body encoded once at import
+PAYLOAD_BYTES = dumps_json({"patient_data": SAMPLE_INTAKE_DATA})
+
 def test_intake_analysis():
     """Test the intake analysis endpoint"""
     print("Testing Intake Analysis Endpoint")
     print("-" * 40)
     
     try:
-        payload = {
-            "patient_data": SAMPLE_INTAKE_DATA
-        }
-        response = requests.post(
-            "http://localhost:8000/api/analysis/direct",
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
+        response = CLIENT.post(
+            "/api/analysis/direct",
+            content=PAYLOAD_BYTES,
+            headers={"Content-Type": "application/json"}
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = loads_json(response.content)
             print("✓ Direct analysis endpoint working (intake analysis)")
             print(f"  Analysis Method: {result.get('analysis_method', 'Unknown')}")
             print(f"  Risk Level: {result.get('diagnosis_analysis', {}).get('risk_level', 'Unknown')}")